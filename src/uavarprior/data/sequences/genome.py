@@ -48,6 +48,46 @@ def _not_blacklist_region(chrom, start, end, blacklist_tabix):
     return True
 
 
+def _mask_blacklist_regions(sequence, chrom, start, end, blacklist_tabix):
+    """
+    Mask the positions of a sequence overlapping blacklist regions.
+
+    Parameters
+    ----------
+    sequence : str
+        The sequence of `chrom` from `start` to `end`.
+    chrom : str
+        The name of the chromosomes, e.g. "chr1".
+    start : int
+        The 0-based start coordinate of the sequence.
+    end : int
+        One past the last coordinate of the sequence.
+    blacklist_tabix : tabix.open or None, optional
+        Default is `None`. Tabix file handle if a file of blacklist regions
+        is available.
+
+    Returns
+    -------
+    str
+        The sequence with the positions in blacklist regions (if specified)
+        replaced by `Genome.UNK_BASE`.
+
+    """
+    if blacklist_tabix is None or start >= end:
+        return sequence
+    try:
+        rows = list(blacklist_tabix.query(chrom, start, end))
+    except tabix.TabixError:
+        return sequence
+    for row in rows:
+        mask_start = max(int(row[1]), start) - start
+        mask_end = min(int(row[2]), end) - start
+        if mask_start < mask_end:
+            sequence = sequence[:mask_start] + \
+                Genome.UNK_BASE * (mask_end - mask_start) + sequence[mask_end:]
+    return sequence
+
+
 def _check_coords(len_chrs,
                   chrom,
                   start,
@@ -434,6 +474,43 @@ class Genome(Sequence):
                                          pad=pad,
                                          blacklist_tabix=self._blacklist_tabix)
 
+    @init
+    def get_chrom_sequence(self, chrom, start=0, end=None):
+        """
+        Gets the sequence of the queried chromosome, or of a region of it.
+        Unlike `get_sequence_from_coords`, a region overlapping blacklist 
+        regions is still returned, with the blacklisted positions masked 
+        as `UNK_BASE`, and the coordinates are clipped to the chromosome
+        boundaries instead of padded.
+
+        Parameters
+        ----------
+        chrom : str
+            The name of the chromosomes, e.g. "chr1".
+        start : int, optional
+            Default is 0. The 0-based start coordinate of the region.
+        end : int or None, optional
+            Default is None, the end of the chromosome. One past the last
+            coordinate of the region.
+
+        Returns
+        -------
+        str
+            The sequence on the positive strand, or an empty string if
+            `chrom` cannot be found in the input FASTA file.
+            Blacklisted positions (if a blacklist exists) are masked.
+
+        """
+        if chrom not in self.len_chrs:
+            return ""
+        start = max(start, 0)
+        end = self.len_chrs[chrom] if end is None else \
+            min(end, self.len_chrs[chrom])
+        if start >= end:
+            return ""
+        return _mask_blacklist_regions(self._genome_sequence(chrom, start, end),
+                                       chrom, start, end, self._blacklist_tabix)
+
     @init
     def get_encoding_from_coords(self,
                                  chrom,
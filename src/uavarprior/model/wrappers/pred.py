@@ -52,6 +52,7 @@ class PredMWrapper(metaclass = ABCMeta):
         self._mode = mode
         self._lossCalculator = lossCalculator
         self._useCuda = useCuda
+        self._useHalf = False
         if self._useCuda:
             self._mode.cuda()
             if self._lossCalculator is not None:
@@ -163,6 +164,14 @@ class PredMWrapper(metaclass = ABCMeta):
             isinstance(self._lossCalculator, nn.Module):
             self._lossCalculator.cuda()
     
+    def toUseHalf(self):
+        '''
+        Use half precision for the model parameters and inputs,
+        meant for making predictions on GPU
+        '''
+        self._useHalf = True
+        self._model.half()
+    
     @abstractmethod
     def fit(self, batchData, optimizer = None):
         """
@@ -200,14 +200,17 @@ class UniSeqMWrapper(PredMWrapper):
             self._model.eval()
         
             allPreds = []
-            for batchData in dataInBatches:
-                inputs = torch.Tensor(batchData['sequence'])
-
-                if self._useCuda:
-                    inputs = inputs.cuda()
-                with torch.no_grad():
+            inputType = torch.float16 if self._useHalf else torch.float32
+            # inference mode also skips the version counter and view 
+            # tracking of no_grad
+            with torch.inference_mode():
+                for batchData in dataInBatches:
+                    inputs = torch.as_tensor(batchData['sequence'], dtype = inputType)
+
+                    if self._useCuda:
+                        inputs = inputs.cuda(non_blocking = True)
                     predictions = self._model(inputs.transpose(1, 2))
-                    allPreds.append(predictions.data.cpu().numpy())
+                    allPreds.append(predictions.float().cpu().numpy())
             allPreds = np.vstack(allPreds)
 
         elif self._model_built == 'tensorflow':
@@ -246,16 +249,17 @@ class UniSeqMWrapper(PredMWrapper):
             else:
                 self._model.eval()
 
-            for batchData in dataInBatches:
-                inputs = torch.Tensor(batchData['sequence'])
-                if self._useCuda:
-                    inputs = inputs.cuda()
-                preds = []
-                for n in range(num_pred):
-                    with torch.no_grad():
+            inputType = torch.float16 if self._useHalf else torch.float32
+            with torch.inference_mode():
+                for batchData in dataInBatches:
+                    inputs = torch.as_tensor(batchData['sequence'], dtype = inputType)
+                    if self._useCuda:
+                        inputs = inputs.cuda(non_blocking = True)
+                    preds = []
+                    for n in range(num_pred):
                         predictions = self._model(inputs.transpose(1, 2))
                         # allPreds.append(predictions.data.cpu().numpy())
-                        preds.append(predictions.data.cpu().numpy())
+                        preds.append(predictions.float().cpu().numpy())
             preds = np.array(preds)
 
 
@@ -12,10 +12,11 @@ import tensorflow as tf
 
 from fugep.data import Genome
 from fugep.data.h5.methylH5Data import readCpgProf
-from ...utils import get_reverse_complement_encoding
 from ...utils import _truncate_sequence
 
 from .utils import read_vcf_file
+from .utils import get_int_encoding_luts
+from .utils import seq_to_one_hot
 from .gve_evaluator import GVarEvaluator
 
 logger = logging.getLogger("fugep")
@@ -70,6 +71,17 @@ class MethylVarEvaluator(GVarEvaluator):
         self._genAssembly = genAssembly
         if self._genAssembly == 'ncbi':
             self._change_chrom(genAssembly)
+        self._asciiLut, self._oneHot, _, _ = get_int_encoding_luts(self._refSeq)
+        # one-hot columns of the complementary bases, the reverse order 
+        # for the usual ACGT ordering
+        self._compCols = [self._refSeq.BASES_ARR.index(
+            self._refSeq.COMPLEMENTARY_BASE_DICT[b]) for b in self._refSeq.BASES_ARR]
+        if self._compCols == list(range(len(self._compCols)))[::-1]:
+            self._compCols = slice(None, None, -1)
+        # batches of sequences are stacked into these buffers
+        scratchShape = (self._batchSize, self._seqLen, len(self._refSeq.BASES_ARR))
+        self._batchScratchRef = np.empty(scratchShape, dtype = np.float32)
+        self._batchScratchAlt = np.empty(scratchShape, dtype = np.float32)
 
         # load variants
         self._variants = read_vcf_file(self._vcfFile, strand_index=self._strandIdx,
@@ -152,22 +164,33 @@ class MethylVarEvaluator(GVarEvaluator):
         altLen = len(alt)
         if altLen > len(refSeqEnc):
             sequence = _truncate_sequence(alt, len(refSeqEnc))
-            return self._refSeq.sequence_to_encoding(sequence)
+            return seq_to_one_hot(sequence, self._asciiLut, self._oneHot)
     
-        altEnc = self._refSeq.sequence_to_encoding(alt)
+        altEnc = seq_to_one_hot(alt, self._asciiLut, self._oneHot)
         if strand == '-':
             altEnc = self._refSeq.getComplementEncoding(altEnc)
         
         if refLen == altLen:  # substitution
             startPos, endPos = self._getRefIdxs(refLen)
-            sequence = np.vstack([refSeqEnc[:startPos, :], altEnc, refSeqEnc[endPos:, :]])
+            sequence = np.empty_like(refSeqEnc)
+            sequence[:startPos] = refSeqEnc[:startPos]
+            sequence[startPos:endPos] = altEnc
+            sequence[endPos:] = refSeqEnc[endPos:]
             return sequence
         elif altLen > refLen:  # insertion
             startPos, endPos = self._getRefIdxs(refLen)
-            sequence = np.vstack([refSeqEnc[:startPos, :], altEnc, refSeqEnc[endPos:, :]])
-            truncStart = (len(sequence) - refSeqEnc.shape[0]) // 2
-            truncEnd = truncStart + refSeqEnc.shape[0]
-            sequence = sequence[truncStart:truncEnd, :]
+            # write the center window of the sequence with the inserted
+            # allele directly, without building the whole sequence
+            seqLen = refSeqEnc.shape[0]
+            truncStart = (altLen - refLen) // 2
+            lhsLen = max(startPos - truncStart, 0)
+            altStart = lhsLen - (startPos - truncStart)
+            nAlt = min(altLen - altStart, seqLen - lhsLen)
+            rhsStart = lhsLen + nAlt
+            sequence = np.empty_like(refSeqEnc)
+            sequence[:lhsLen] = refSeqEnc[truncStart:startPos]
+            sequence[lhsLen:rhsStart] = altEnc[altStart:altStart + nAlt]
+            sequence[rhsStart:] = refSeqEnc[endPos:endPos + seqLen - rhsStart]
             return sequence
         else:  # deletion
             lhs = self._refSeq.get_sequence_from_coords(chrom,
@@ -183,7 +206,7 @@ class MethylVarEvaluator(GVarEvaluator):
                     sequence = sequence[len(sequence)-len(refSeqEnc): len(sequence)]
                 else:
                     sequence = sequence[:len(refSeqEnc)]
-            return self._refSeq.sequence_to_encoding(sequence)
+            return seq_to_one_hot(sequence, self._asciiLut, self._oneHot)
     
     
     def _handleStandardRef(self,refPos, refEnc, seqEnc):
@@ -207,7 +230,7 @@ class MethylVarEvaluator(GVarEvaluator):
         refLen = refEnc.shape[0]
         seqEncAtRef = seqEnc
         refStart = refLen // 2 - self._startRadius - 1
-        refEnd = refLen // 2 + self._endRadius - 1;[]
+        refEnd = refLen // 2 + self._endRadius - 1
         refEnc = refEnc[refStart:refEnd]
         match = np.array_equal(seqEncAtRef, refEnc)
     
@@ -235,8 +258,15 @@ class MethylVarEvaluator(GVarEvaluator):
         None
     
         """
-        batchRefSeqs = np.array(batchRefSeqs)
-        batchAltSeqs = np.array(batchAltSeqs)
+        nSeqs = len(batchRefSeqs)
+        if nSeqs > self._batchScratchRef.shape[0]:
+            # a batch can exceed batchSize as sequences of all CpGs near 
+            # a variant are added together
+            scratchShape = (nSeqs,) + self._batchScratchRef.shape[1:]
+            self._batchScratchRef = np.empty(scratchShape, dtype = np.float32)
+            self._batchScratchAlt = np.empty(scratchShape, dtype = np.float32)
+        batchRefSeqs = np.stack(batchRefSeqs, out = self._batchScratchRef[:nSeqs])
+        batchAltSeqs = np.stack(batchAltSeqs, out = self._batchScratchAlt[:nSeqs])
         if self._model._model_built == 'tensorflow':
             batchRefSeqs = tf.convert_to_tensor(batchRefSeqs)
             batchAltSeqs = tf.convert_to_tensor(batchAltSeqs)
@@ -332,7 +362,7 @@ class MethylVarEvaluator(GVarEvaluator):
                     # else:
                     refSeqEnc, containsUnk = self._refSeq.get_encoding_from_coords_check_unk(chrom, cpg_win_start-1, cpg_win_end-1)
 
-                    refEnc = self._refSeq.sequence_to_encoding(ref)
+                    refEnc = seq_to_one_hot(ref, self._asciiLut, self._oneHot)
                     if strand == '-':
                         refEnc = self._refSeq.getComplementEncoding(refEnc)
                     altSeqEnc = self._processAlt(chrom, pos, ref, alt, cpg_win_start-1, cpg_win_end-1, refSeqEnc)
@@ -363,10 +393,9 @@ class MethylVarEvaluator(GVarEvaluator):
 
                     batchIds.append((chrom, cpg, pos, name, ref, alt, strand, match, containsUnk))
                     if strand == '-':
-                        refSeqEnc = get_reverse_complement_encoding(refSeqEnc,
-                            self._refSeq.BASES_ARR, self._refSeq.COMPLEMENTARY_BASE_DICT)
-                        altSeqEnc = get_reverse_complement_encoding(altSeqEnc,
-                            self._refSeq.BASES_ARR, self._refSeq.COMPLEMENTARY_BASE_DICT)
+                        # views for the ACGT ordering, copied into the batch
+                        refSeqEnc = refSeqEnc[::-1, self._compCols]
+                        altSeqEnc = altSeqEnc[::-1, self._compCols]
                     # if not refSeqEnc.shape == altSeqEnc.shape:
                     #     print(f'refSeqEnc and altSeqEnc do not have the same shape')
                     batchRefSeqs.append(refSeqEnc)
@@ -4,20 +4,91 @@ Created on May 28, 2021
 @author: jsun
 '''
 
+from concurrent.futures import ThreadPoolExecutor
 from time import time
+import functools
 import logging
-import math
 import numpy as np
 
 from ....data import Genome
-from ...utils import get_reverse_complement_encoding
 from ...utils import _truncate_sequence
 
 from .utils import read_vcf_file  
+from .utils import get_int_encoding_luts
+from .utils import seq_to_int
+from .utils import int_to_seq
 from .gve_evaluator import GVarEvaluator
 
 logger = logging.getLogger("uavarprior")
 
+# numba is optional, the kernels below run as plain numpy code without it
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@njit(cache = True, nogil = True)
+def _process_alt_sub(ref_seq_int, alt_int, start_pos, end_pos, out):
+    '''
+    Write the reference sequence with bases [start_pos, end_pos) replaced
+    by the alternative allele of the same length into out
+    '''
+    altLen = alt_int.shape[0]
+    out[:start_pos] = ref_seq_int[:start_pos]
+    out[start_pos:start_pos + altLen] = alt_int
+    out[start_pos + altLen:] = ref_seq_int[end_pos:]
+    return out
+
+
+@njit(cache = True, nogil = True)
+def _process_alt_ins(ref_seq_int, alt_int, start_pos, end_pos, out):
+    '''
+    Write the center window, of the reference sequence length, of the 
+    reference sequence with bases [start_pos, end_pos) replaced by 
+    the longer alternative allele into out
+    '''
+    seqLen = ref_seq_int.shape[0]
+    altLen = alt_int.shape[0]
+    truncStart = (altLen - (end_pos - start_pos)) // 2
+    lhsLen = start_pos - truncStart
+    if lhsLen >= 0:
+        out[:lhsLen] = ref_seq_int[truncStart:start_pos]
+        altStart = 0
+    else: # the window starts within the alternative allele
+        lhsLen = 0
+        altStart = truncStart - start_pos
+    nAlt = min(altLen - altStart, seqLen - lhsLen)
+    out[lhsLen:lhsLen + nAlt] = alt_int[altStart:altStart + nAlt]
+    rhsStart = lhsLen + nAlt
+    out[rhsStart:] = ref_seq_int[end_pos:end_pos + seqLen - rhsStart]
+    return out
+
+
+@njit(cache = True, nogil = True)
+def _process_alt_del(lhs_int, alt_int, rhs_int, out):
+    '''
+    Write the concatenation of lhs_int, alt_int and rhs_int into out
+    '''
+    lhsLen = lhs_int.shape[0]
+    altLen = alt_int.shape[0]
+    out[:lhsLen] = lhs_int
+    out[lhsLen:lhsLen + altLen] = alt_int
+    out[lhsLen + altLen:] = rhs_int
+    return out
+
+
+@njit(cache = True, nogil = True)
+def _ref_matches(seq_int, ref_int, start_pos):
+    '''
+    Check whether seq_int contains ref_int starting at start_pos
+    '''
+    return np.array_equal(seq_int[start_pos:start_pos + ref_int.shape[0]], ref_int)
+
+
 class PeakGVarEvaluator(GVarEvaluator):
     '''
     Implementation of variant effect evaluator by 
@@ -32,15 +103,40 @@ class PeakGVarEvaluator(GVarEvaluator):
     strandIdx: int or None, optional.
         Default is None. If applicable, specify the column index (0-based)
         in the VCF file that contains strand information for each variant.
+    groupVariants : bool, optional
+        Default is False. If True, variants are evaluated grouped by 
+        chromosome, then by type (substitution, insertion, deletion) and
+        then by position instead of in the order of the VCF file, so that 
+        the variants in a batch take the same processing path. Rows in the
+        output files follow this evaluation order, not the order of the 
+        VCF file, and are identified by the variant columns.
+    useHalf : bool, optional
+        Default is False. If True and `useCuda` is True, the model is 
+        converted to half precision and the one-hot encoded sequences 
+        are passed to it as float16, which represents them exactly.
+    numWorkers : int, optional
+        Default is 1. Number of threads preparing the input sequences of
+        the variants in a batch.
+    flushInterval : int or None, optional
+        Default is None. If specified, reporters write their results to 
+        file every `flushInterval` batches, in addition to when 
+        `writeMemLimit` is reached.
     '''
-
+    
+    # number of bases of the reference sequence loaded at a time
+    REF_BLOCK_LEN = 2 ** 20
+    # minimum number of variants in position order for loading a new 
+    # block, shorter runs of variants fetch their sequences on their own
+    MIN_BLOCK_RUN = 16
 
     def __init__(self, analysis, model, trainedModelPath, features, 
                  vcfFile, strandIdx = None, requireStrand = False,
                  outputDir = None, save_mult_pred = False, outputFormat = 'tsv',
                  seqLen = None, batchSize = 64, useCuda = False,
                  dataParallel = False, refSeq = Genome, genAssembly=None,
-                 writeMemLimit = 5000, loggingVerbosity = 2):
+                 writeMemLimit = 5000, loggingVerbosity = 2,
+                 groupVariants = False, useHalf = False, numWorkers = 1,
+                 flushInterval = None):
         '''
         Construct a new object of 'GVarEvaluator'
         '''
@@ -68,24 +164,243 @@ class PeakGVarEvaluator(GVarEvaluator):
             output_NAs_to_file = "{0}-invalid.vcf".format(self._outputPathPrefix),
             seq_context = (self._startRadius, self._endRadius),
             reference_sequence = self._refSeq)
+        if groupVariants:
+            self._variants = self._groupVariants(self._variants)
         self._reporters = self._initializeReporters(self._outputPathPrefix,
             self.VARIANTEFFECT_COLS, self._model._mult_predictions, save_mult_pred,
             outputSize = len(self._variants),
             outputFormat = self._outputFormat)
+        
+        # sequences are processed as integer base codes, see 
+        # build_int_encoding_luts, and only one-hot encoded for the model 
+        self._asciiLut, self._oneHot, self._complementLut, self._intToAscii = \
+            get_int_encoding_luts(self._refSeq)
+        self._unkCode = len(self._refSeq.BASES_ARR)
+        # center of the sequence, the left one if the length is even
+        self._mid = (self._seqLen - 1) // 2
+        # block of the reference sequence in use, (chrom, start, 
+        # encoding, whether it reaches the end of the chromosome), and 
+        # the one being prefetched, (chrom, future)
+        self._refBlock = (None, 0, np.empty(0, dtype = np.int8), True)
+        self._nextRefBlock = (None, None)
+        self._blockLoader = None
+        # the set of distinct alleles is usually small 
+        self._encodeAllele = functools.lru_cache(maxsize = 65536)(
+            self._encodeAlleleNoCache)
+        
+        # one-hot encoded sequences of a batch are written in place, ref
+        # sequences in the top half and alt sequences in the bottom half
+        # of the buffer, so a full batch is passed to the model as is.
+        # Two buffers are used in turn, one is filled while the model
+        # makes predictions on the other
+        bufType = np.float32
+        if useHalf:
+            if useCuda and self._model._model_built == 'pytorch':
+                self._model.toUseHalf()
+                bufType = np.float16
+            else:
+                logger.warning("`useHalf` is only supported for pytorch "
+                               "models on GPU, full precision is used")
+        self._oneHot = self._oneHot.astype(bufType, copy = False)
+        # one-hot encoding of the complement of each base code
+        self._rcOneHot = self._oneHot[self._complementLut]
+        bufShape = (2 * self._batchSize, self._seqLen, 
+                    len(self._refSeq.BASES_ARR))
+        if useCuda and self._model._model_built == 'pytorch':
+            # page-locked memory for faster copies to GPU
+            import torch
+            torchType = torch.float16 if bufType == np.float16 else torch.float32
+            self._catBufs = [torch.empty(bufShape, dtype = torchType, 
+                pin_memory = True).numpy() for _ in range(2)]
+        else:
+            self._catBufs = [np.empty(bufShape, dtype = bufType) 
+                             for _ in range(2)]
+        self._predFutures = [None, None]
+        self._predictor = None
+        self._useBuffer(0)
+        self._batchIds = [None] * self._batchSize
+        self._bIdx = 0
+        # scratch space of alt sequences before the one-hot encoding
+        self._altIntBuf = np.empty((self._batchSize, self._seqLen), 
+                                   dtype = np.int8)
+        self._numWorkers = numWorkers
+        self._flushInterval = flushInterval
+        self._nBatches = 0
+    
+    @staticmethod
+    def _groupVariants(variants):
+        '''
+        Sort variants by chromosome, in the order of first appearance, 
+        then by variant type and position, so that the reference sequence
+        of each group is read in order. Variants are not ordered by their
+        allele lengths, that would break up the position runs the 
+        reference blocks are loaded for. The returned order is the order 
+        of the output rows, not that of the VCF file.
+        '''
+        chromOrder = {}
+        for v in variants:
+            chromOrder.setdefault(v[0], len(chromOrder))
+        
+        def sortKey(v):
+            refLen = len(v[3])
+            altLen = 0 if v[4] == '*' or v[4] == '-' else len(v[4])
+            if refLen == altLen:
+                varType = 0 # substitution
+            elif altLen > refLen:
+                varType = 1 # insertion
+            else:
+                varType = 2 # deletion
+            return (chromOrder[v[0]], varType, v[1])
+        
+        return sorted(variants, key = sortKey)
+    
+    def _encodeAlleleNoCache(self, allele, strand = '+'):
+        '''
+        Get the integer encoding of an allele, complemented if on the
+        negative strand. The encoding is read-only as it is cached, 
+        see _encodeAllele.
+        '''
+        alleleEnc = seq_to_int(allele, self._asciiLut)
+        if strand == '-':
+            alleleEnc = self._complementLut[alleleEnc]
+        alleleEnc.setflags(write = False)
+        return alleleEnc
+    
+    def _loadRefBlock(self, chrom, start, end, minLen = 0):
+        '''
+        Load the integer encoding of the reference sequence of chrom from 
+        start to end, or minLen bases if more, as a block
+        '''
+        start = max(start, 0)
+        end = max(end, start + minLen)
+        seq = self._refSeq.get_chrom_sequence(chrom, start, end)
+        return (chrom, start, seq_to_int(seq, self._asciiLut), 
+                len(seq) < end - start)
+    
+    @staticmethod
+    def _blockCovers(block, chrom, start, end):
+        '''
+        Check whether the block covers the positions of chrom from start 
+        to end that are within the chromosome
+        '''
+        blockChrom, blockStart, blockEnc, toChromEnd = block
+        return blockChrom == chrom and blockStart <= max(start, 0) and \
+            (end <= blockStart + blockEnc.shape[0] or toChromEnd)
+    
+    def _cacheRefBlock(self, chrom, start, end):
+        '''
+        Make the block of the reference sequence in use cover the positions
+        of chrom from start to end, and prefetch the next block if a 
+        block loader is running
+        '''
+        if self._blockCovers(self._refBlock, chrom, start, end):
+            return
+        block = None
+        nextChrom, nextBlock = self._nextRefBlock
+        self._nextRefBlock = (None, None)
+        if nextChrom == chrom:
+            block = nextBlock.result()
+            if not self._blockCovers(block, chrom, start, end):
+                block = None
+        if block is None:
+            # keep a margin on the left for the deletion flanks and 
+            # variants slightly out of order
+            block = self._loadRefBlock(chrom, start - self._seqLen, end,
+                                       self.REF_BLOCK_LEN)
+        self._refBlock = block
+        
+        _, blockStart, blockEnc, toChromEnd = block
+        if self._blockLoader is not None and not toChromEnd:
+            nextStart = blockStart + blockEnc.shape[0] - self._seqLen
+            self._nextRefBlock = (chrom, self._blockLoader.submit(
+                self._loadRefBlock, chrom, nextStart, nextStart, 
+                self.REF_BLOCK_LEN))
+    
+    def _sliceChrom(self, chrom, start, end):
+        '''
+        Get the integer encoding of the reference sequence at the given 
+        coordinates, from the cached reference block if it covers them and
+        fetched on its own otherwise. Out of bounds positions are taken as 
+        unknown. The cached block is not changed, see evaluate, so this
+        can be called concurrently.
+        
+        The returned encoding can be a view of the cached reference block
+        and must not be modified in place.
+        '''
+        block = self._refBlock
+        if not self._blockCovers(block, chrom, start, end):
+            block = self._loadRefBlock(chrom, start, end)
+        _, blockStart, blockEnc, _ = block
+        blockEnd = blockStart + blockEnc.shape[0]
+        if start >= blockStart and end <= blockEnd:
+            return blockEnc[start - blockStart:end - blockStart]
+        seqEnc = np.full(max(end - start, 0), self._unkCode, dtype = np.int8)
+        inStart, inEnd = max(start, blockStart), min(end, blockEnd)
+        if inStart < inEnd:
+            seqEnc[inStart - start:inEnd - start] = \
+                blockEnc[inStart - blockStart:inEnd - blockStart]
+        return seqEnc
+    
+    def _getWindows(self, variants):
+        '''
+        Get the coordinates of the reference sequences of all variants at 
+        once, which center the sequence containing the ref allele based 
+        on the size of ref. Also returns the coordinates extended by the 
+        flanks needed by deletions.
+        '''
+        nVars = len(variants)
+        pos = np.fromiter((v[1] for v in variants), dtype = np.int64, 
+                          count = nVars)
+        refLen = np.fromiter((len(v[3]) for v in variants), dtype = np.int64,
+                             count = nVars)
+        center = pos - 1 + refLen // 2
+        starts = center - self._startRadius
+        ends = center + self._endRadius
+        spanStarts = starts - refLen // 2
+        spanEnds = ends + (refLen + 1) // 2
+        return (starts.tolist(), ends.tolist(), 
+                spanStarts.tolist(), spanEnds.tolist())
+    
+    def _getRunLens(self, variants, spanStarts):
+        '''
+        Get the number of variants from each variant to the end of its
+        run of variants in position order on the same chromosome. Steps
+        back by less than the sequence length, which the cached blocks
+        keep as a margin, do not end a run.
+        '''
+        nVars = len(variants)
+        if not nVars:
+            return []
+        spanStarts = np.asarray(spanStarts, dtype = np.int64)
+        # whether the next variant continues the run
+        cont = np.zeros(nVars, dtype = bool)
+        cont[:-1] = spanStarts[1:] >= spanStarts[:-1] - self._seqLen
+        cont[:-1] &= np.fromiter((a[0] == b[0] for a, b in 
+                                  zip(variants, variants[1:])), 
+                                 dtype = bool, count = nVars - 1)
+        runEnds = np.flatnonzero(~cont)
+        ixs = np.arange(nVars)
+        return (runEnds[np.searchsorted(runEnds, ixs)] - ixs + 1).tolist()
+    
+    def _getRefSeqEnc(self, chrom, start, end):
+        '''
+        Get the integer encoding of the reference sequence at the given 
+        coordinates, see _sliceChrom, and check whether it contains 
+        unknown base(s). 
+        '''
+        seqEnc = self._sliceChrom(chrom, start, end)
+        return seqEnc, bool(np.any(seqEnc == self._unkCode))
     
     def _getRefIdxs(self, refLen):
         '''
         Assume the reference is centered in the sequence
         '''
-        mid = self._seqLen // 2
-        if self._seqLen % 2 == 0:
-            mid -= 1
-        startPos = mid - refLen // 2
-        endPos = startPos + refLen
-        return (startPos, endPos)
+        startPos = self._mid - refLen // 2
+        return (startPos, startPos + refLen)
     
     
-    def _processAlt(self, chrom, pos, ref, alt, start, end, refSeqEnc, strand = '+'):
+    def _processAlt(self, chrom, pos, ref, alt, start, end, refSeqEnc, strand = '+',
+                    out = None):
         """
         Return the encoded sequence centered at a given allele for input into
         the model.
@@ -105,15 +420,19 @@ class PeakGVarEvaluator(GVarEvaluator):
         end : int
             The end coordinate of reference squence (refSeqEnc) in genome 
         refSeqEnc : numpy.ndarray
-            The reference sequence encoding
+            The integer encoding of the reference sequence
             It is assumed the refSeq comes from positive strand
         strand : strand of the variant
+        out : numpy.ndarray or None, optional
+            Preallocated int8 buffer of the reference sequence length to
+            write the result into. It is overwritten by the next call, 
+            so the result must be consumed before then.
         
         Returns
         -------
-        list(numpy.ndarray)
-            A list of the encoded sequences containing alternate alleles at
-            the center
+        numpy.ndarray
+            The integer encoding of the sequence containing alternate 
+            allele at the center
     
         """
         if alt == '*' or alt == '-':   # indicates a deletion
@@ -122,32 +441,35 @@ class PeakGVarEvaluator(GVarEvaluator):
         altLen = len(alt)
         if altLen > len(refSeqEnc):
             sequence = _truncate_sequence(alt, len(refSeqEnc))
-            return self._refSeq.sequence_to_encoding(sequence)
+            return seq_to_int(sequence, self._asciiLut)
     
-        altEnc = self._refSeq.sequence_to_encoding(alt)
-        if strand == '-':
-            altEnc = self._refSeq.getComplementEncoding(altEnc)
+        if out is None:
+            out = np.empty(refSeqEnc.shape[0], dtype = np.int8)
+        if refLen == 1 and altLen == 1: # single nucleotide substitution
+            altCode = self._asciiLut[ord(alt)]
+            if strand == '-':
+                altCode = self._complementLut[altCode]
+            out[:] = refSeqEnc
+            out[self._mid] = altCode
+            return out
         
+        altEnc = self._encodeAllele(alt, strand)
         if refLen == altLen:  # substitution
             startPos, endPos = self._getRefIdxs(refLen)
-            sequence = np.vstack([refSeqEnc[:startPos, :], altEnc, refSeqEnc[endPos:, :]])
-            return sequence
+            return _process_alt_sub(refSeqEnc, altEnc, startPos, endPos, out)
         elif altLen > refLen:  # insertion
             startPos, endPos = self._getRefIdxs(refLen)
-            sequence = np.vstack([refSeqEnc[:startPos, :], altEnc, refSeqEnc[endPos:, :]])
-            truncStart = (len(sequence) - refSeqEnc.shape[0]) // 2
-            truncEnd = truncStart + refSeqEnc.shape[0]
-            sequence = sequence[truncStart:truncEnd, :]
-            return sequence
+            return _process_alt_ins(refSeqEnc, altEnc, startPos, endPos, out)
         else:  # deletion
-            lhs = self._refSeq.get_sequence_from_coords(chrom,
-                start - refLen // 2 + altLen // 2,
-                pos + 1, pad = True)
-            rhs = self._refSeq.get_sequence_from_coords(chrom, pos + 1 + refLen,
-                end + math.ceil(refLen / 2.) - math.ceil(altLen / 2.),
-                pad = True)
-            sequence = lhs + alt + rhs
-            return self._refSeq.sequence_to_encoding(sequence)
+            # flanking sequences come from the cached chromosome
+            lhs = self._sliceChrom(chrom, start - refLen // 2 + altLen // 2,
+                                   pos + 1)
+            rhs = self._sliceChrom(chrom, pos + 1 + refLen,
+                end + (refLen + 1) // 2 - (altLen + 1) // 2)
+            seqLen = lhs.shape[0] + altLen + rhs.shape[0]
+            if seqLen != out.shape[0]:
+                out = np.empty(seqLen, dtype = np.int8)
+            return _process_alt_del(lhs, altEnc, rhs, out)
     
     
     def _handleStandardRef(self, refEnc, seqEnc):
@@ -156,13 +478,14 @@ class PeakGVarEvaluator(GVarEvaluator):
         refLen = refEnc.shape[0]
         startPos, _ = self._getRefIdxs(refLen)
     
-        seqEncAtRef = seqEnc[startPos:startPos + refLen, :]
-        match = np.array_equal(seqEncAtRef, refEnc)
+        match = _ref_matches(seqEnc, refEnc, startPos)
     
         seqAtRef = None
         if not match:
-            seqAtRef = self._refSeq.encoding_to_sequence(seqEncAtRef)
-            seqEnc[startPos:startPos + refLen, :] = refEnc # replace
+            seqAtRef = int_to_seq(seqEnc[startPos:startPos + refLen], 
+                                  self._intToAscii)
+            seqEnc = seqEnc.copy() # seqEnc can be a view of the chromosome
+            seqEnc[startPos:startPos + refLen] = refEnc # replace
         return match, seqEnc, seqAtRef
     
     
@@ -170,77 +493,174 @@ class PeakGVarEvaluator(GVarEvaluator):
         refLen = refEnc.shape[0]
         seqEncAtRef = seqEnc
         refStart = refLen // 2 - self._startRadius - 1
-        refEnd = refLen // 2 + self._endRadius - 1;[]
+        refEnd = refLen // 2 + self._endRadius - 1
         refEnc = refEnc[refStart:refEnd]
         match = np.array_equal(seqEncAtRef, refEnc)
     
         seqRef = None
         if not match:
-            seqRef = self._refSeq.encoding_to_sequence(seqEncAtRef)
+            seqRef = int_to_seq(seqEncAtRef, self._intToAscii)
             seqEnc = refEnc # use ref in vcf
         return match, seqEnc, seqRef
     
     
-    def _handleRefAltPredictions(self, batchRefSeqs, batchAltSeqs, batchIds):
+    def _handleRefAltPredictions(self, batchSeqs, batchIds):
         """
         Helper method for variant effect prediction. Gets the model
         predictions and updates the reporters.
     
         Parameters
         ----------
-        batchRefSeqs : list(np.ndarray)
-            One-hot encoded sequences with the ref base(s).
-        batchAltSeqs : list(np.ndarray)
-            One-hot encoded sequences with the alt base(s).
+        batchSeqs : np.ndarray
+            One-hot encoded sequences with the ref base(s) followed by
+            those with the alt base(s), in the same order of batchIds.
+        batchIds : list(tuple)
+            Identifiers of the variants in the batch.
             
         Returns
         -------
         None
     
         """
-        batchRefSeqs = np.array(batchRefSeqs)
-        batchAltSeqs = np.array(batchAltSeqs)
-        batchSeqs = np.concatenate([batchRefSeqs, batchAltSeqs])
-        # if (batchRefSeqs.shape[0] != self._batchSize) and (batchAltSeqs.shape[0] != self._batchSize):
-        #     print(f'ref shape: {batchRefSeqs.shape}, alt shape: {batchAltSeqs.shape}, batch size: {self._batchSize}')
-        #     pass
-
-        # else:
+        nVars = len(batchIds)
         n_pred = self._model._mult_predictions
         if n_pred > 1:
             outputs = self._model.predict_mult([{'sequence': batchSeqs}])
-            refOutputs = outputs[:, :batchRefSeqs.shape[0], :]
-            altOutputs = outputs[:, batchAltSeqs.shape[0]:, :]
+            refOutputs = outputs[:, :nVars, :]
+            altOutputs = outputs[:, nVars:, :]
             for r in self._reporters:
                 if r.needs_base_pred:
-                    if self._save_mult_pred:
-                        r.handle_batch_mult_predictions(altOutputs, batchIds, refOutputs)
-                        # r.handle_batch_mult_predictions(altOutputs, batchIds, refOutputs)
-                    else:
-                        r.handle_batch_mult_predictions(altOutputs, batchIds, refOutputs)
+                    r.handle_batch_mult_predictions(altOutputs, batchIds, refOutputs)
                 else:
                     r.handle_batch_mult_predictions(altOutputs, batchIds)
-
-
-        # n_pred = self._model._mult_predictions
-        # if n_pred > 1:
-        #     refOutputs = self._model.predict_mult([{'sequence': batchRefSeqs}])
-        #     altOutputs = self._model.predict_mult([{'sequence': batchAltSeqs}])
-        #     for r in self._reporters:
-        #         if r.needs_base_pred:
-        #             # r.handle_batch_mult_predictions(altOutputs, batchIds, refOutputs)
-        #             r.handle_batch_mult_predictions_temp(altOutputs, batchIds, refOutputs)
-        #         else:
-        #             r.handle_batch_mult_predictions(altOutputs, batchIds)
         else:
-            refOutputs = self._model.predict([{'sequence': batchRefSeqs}])
-            altOutputs = self._model.predict([{'sequence': batchAltSeqs}])
+            outputs = self._model.predict([{'sequence': batchSeqs}])
+            refOutputs = outputs[:nVars]
+            altOutputs = outputs[nVars:]
             for r in self._reporters:
                 if r.needs_base_pred:
                     r.handle_batch_predictions(altOutputs, batchIds, refOutputs)
                 else:
                     r.handle_batch_predictions(altOutputs, batchIds)
         
+        self._nBatches += 1
+        if self._flushInterval and self._nBatches % self._flushInterval == 0:
+            for r in self._reporters:
+                r.write_to_file()
+        
+    def _prepareVariant(self, variant, start, end, bIdx):
+        '''
+        Encode the reference and alternative sequences of a variant, whose 
+        reference sequence spans from start to end, into row bIdx of the 
+        batch buffers. Variants written to different rows can be prepared 
+        concurrently, see evaluate.
+        '''
+        chrom, pos, name, ref, alt, strand = variant
+        refSeqEnc, containsUnk = self._getRefSeqEnc(chrom, start, end)
+
+        refEnc = self._encodeAllele(ref, strand)
+        altSeqEnc = self._processAlt(chrom, pos, ref, alt, start, end, refSeqEnc,
+                                     out = self._altIntBuf[bIdx])
+        
+        # check if the reference sequence of the variant matches with reference genome
+        match = True
+        seqAtRef = None
+        if len(ref) and len(ref) < self._seqLen:
+            match, refSeqEnc, seqAtRef = self._handleStandardRef(refEnc, refSeqEnc)
+        elif len(ref) >= self._seqLen:
+            match, refSeqEnc, seqAtRef = self._handleLongRef(refEnc, refSeqEnc)
+
+        if containsUnk:
+            logger.warn("For variant ({0}, {1}, {2}, {3}, {4}, {5}), "
+                       "reference sequence contains unknown base(s)"
+                       "--will be marked `True` in the `contains_unk` column "
+                       "of the .tsv or the row_labels .txt file.".format(
+                         chrom, pos, name, ref, alt, strand))
+        if not match:
+            logger.warn("For variant ({0}, {1}, {2}, {3}, {4}, {5}), "
+                          "reference does not match the reference genome. "
+                          "Reference genome contains {6} instead. "
+                          "Predictions/scores associated with this "
+                          "variant--where we use '{3}' in the input "
+                          "sequence--will be marked `False` in the `ref_match` "
+                          "column of the .tsv or the row_labels .txt file".format(
+                              chrom, pos, name, ref, alt, strand, seqAtRef))
+        
+        # self._batchIds[bIdx] = (chrom, pos, name, ref, alt, strand, match, containsUnk)
+        self._batchIds[bIdx] = (chrom, pos, name)
+        oneHot = self._oneHot
+        if strand == '-': # reverse complement
+            oneHot = self._rcOneHot
+            refSeqEnc = refSeqEnc[::-1]
+            altSeqEnc = altSeqEnc[::-1]
+        # mode other than 'raise' avoids buffering of out
+        np.take(oneHot, refSeqEnc, axis = 0, 
+                out = self._refBuf[bIdx], mode = 'clip')
+        np.take(oneHot, altSeqEnc, axis = 0, 
+                out = self._altBuf[bIdx], mode = 'clip')
+    
+    def _useBuffer(self, bufIdx):
+        '''
+        Make bufIdx the current batch buffer, waiting for the predictions
+        on it to finish first
+        '''
+        future = self._predFutures[bufIdx]
+        if future is not None:
+            self._predFutures[bufIdx] = None
+            future.result()
+        self._curBuf = bufIdx
+        self._catBuf = self._catBufs[bufIdx]
+        self._refBuf = self._catBuf[:self._batchSize]
+        self._altBuf = self._catBuf[self._batchSize:]
+    
+    def _flushBatch(self, nVars):
+        '''
+        Submit the first nVars variants in the current batch buffer for
+        predictions and switch to the other buffer
+        '''
+        batchSeqs = self._catBuf
+        if nVars < self._batchSize:
+            # move alt sequences of the partial batch next to the ref ones
+            batchSeqs[nVars:2 * nVars] = self._altBuf[:nVars]
+            batchSeqs = batchSeqs[:2 * nVars]
+        # ids are copied as reporters keep a reference to them
+        self._predFutures[self._curBuf] = self._predictor.submit(
+            self._handleRefAltPredictions, batchSeqs, self._batchIds[:nVars])
+        self._useBuffer(1 - self._curBuf)
+    
+    def _prepareVariants(self, rows):
+        '''
+        Prepare the variants of rows, given as the arguments of 
+        _prepareVariant
+        '''
+        for row in rows:
+            self._prepareVariant(*row)
+    
+    def _prepareRows(self, rows, executor = None):
+        '''
+        Prepare the variants of rows and empty the list. With an executor,
+        the rows are split in one chunk per worker, so that a batch is 
+        submitted as a few tasks rather than one task per variant.
+        '''
+        if executor is None:
+            self._prepareVariants(rows)
+        elif rows:
+            chunkSize = -(-len(rows) // self._numWorkers)
+            self._waitFor([executor.submit(self._prepareVariants, 
+                                           rows[i:i + chunkSize])
+                           for i in range(0, len(rows), chunkSize)])
+        rows.clear()
+    
+    @staticmethod
+    def _waitFor(pending):
+        '''
+        Wait for the pending futures, raising the first error if any,
+        and empty the list
+        '''
+        for future in pending:
+            future.result()
+        pending.clear()
+        
     def evaluate(self, inputData = None):
         """
         Get model predictions and scores for a list of variants.
@@ -272,67 +692,62 @@ class PeakGVarEvaluator(GVarEvaluator):
 
         """
         num_variants = len(self._variants)
-        batchRefSeqs, batchAltSeqs, batchIds = [], [], []
-        stepTime = time()
-        for ix, (chrom, pos, name, ref, alt, strand) in enumerate(self._variants):
-            # centers the sequence containing the ref allele based on the size
-            # of ref
-            center = pos - 1 + len(ref) // 2
-            start = center - self._startRadius
-            end = center + self._endRadius
-            refSeqEnc, containsUnk = self._refSeq.get_encoding_from_coords_check_unk(chrom, start, end)
-
-            refEnc = self._refSeq.sequence_to_encoding(ref)
-            if strand == '-':
-                refEnc = self._refSeq.getComplementEncoding(refEnc)
-            altSeqEnc = self._processAlt(chrom, pos, ref, alt, start, end, refSeqEnc)
-            
-            # check if the reference sequence of the variant matches with reference genome
-            match = True
-            seqAtRef = None
-            if len(ref) and len(ref) < self._seqLen:
-                match, refSeqEnc, seqAtRef = self._handleStandardRef(refEnc, refSeqEnc)
-            elif len(ref) >= self._seqLen:
-                match, refSeqEnc, seqAtRef = self._handleLongRef(refEnc, refSeqEnc)
-
-            if containsUnk:
-                logger.warn("For variant ({0}, {1}, {2}, {3}, {4}, {5}), "
-                           "reference sequence contains unknown base(s)"
-                           "--will be marked `True` in the `contains_unk` column "
-                           "of the .tsv or the row_labels .txt file.".format(
-                             chrom, pos, name, ref, alt, strand))
-            if not match:
-                logger.warn("For variant ({0}, {1}, {2}, {3}, {4}, {5}), "
-                              "reference does not match the reference genome. "
-                              "Reference genome contains {6} instead. "
-                              "Predictions/scores associated with this "
-                              "variant--where we use '{3}' in the input "
-                              "sequence--will be marked `False` in the `ref_match` "
-                              "column of the .tsv or the row_labels .txt file".format(
-                                  chrom, pos, name, ref, alt, strand, seqAtRef))
-            
-            # batchIds.append((chrom, pos, name, ref, alt, strand, match, containsUnk))
-            batchIds.append((chrom, pos, name))
-            if strand == '-':
-                refSeqEnc = get_reverse_complement_encoding(refSeqEnc,
-                    self._refSeq.BASES_ARR, self._refSeq.COMPLEMENTARY_BASE_DICT)
-                altSeqEnc = get_reverse_complement_encoding(altSeqEnc,
-                    self._refSeq.BASES_ARR, self._refSeq.COMPLEMENTARY_BASE_DICT)
-                
-            batchRefSeqs.append(refSeqEnc)
-            batchAltSeqs.append(altSeqEnc)
+        self._bIdx = 0
+        self._nBatches = 0
+        executor = None
+        if self._numWorkers > 1:
+            executor = ThreadPoolExecutor(max_workers = self._numWorkers)
+        # rows of the current batch yet to be prepared
+        rows = []
+        # predictions and reporters run in a single thread, in batch order
+        self._predictor = ThreadPoolExecutor(max_workers = 1)
+        self._blockLoader = ThreadPoolExecutor(max_workers = 1)
+        try:
+            starts, ends, spanStarts, spanEnds = self._getWindows(self._variants)
+            runLens = self._getRunLens(self._variants, spanStarts)
+            stepTime = time()
+            for ix, variant in enumerate(self._variants):
+                bIdx = self._bIdx
+                # a new block is loaded for the reference needed by the 
+                # variant, including the flanks of deletions, only if enough
+                # variants follow in order to use it, as for sorted VCF files
+                if runLens[ix] >= self.MIN_BLOCK_RUN and \
+                        not self._blockCovers(self._refBlock, variant[0], 
+                                              spanStarts[ix], spanEnds[ix]):
+                    # switch the cached block once the rows so far are 
+                    # prepared with the previous one
+                    self._prepareRows(rows, executor)
+                    self._cacheRefBlock(variant[0], spanStarts[ix], spanEnds[ix])
+                rows.append((variant, starts[ix], ends[ix], bIdx))
+                self._bIdx += 1
 
-            if len(batchRefSeqs) >= self._batchSize:
-                self._handleRefAltPredictions(batchRefSeqs, batchAltSeqs, batchIds)
-                batchRefSeqs, batchAltSeqs, batchIds = [], [], []
+                if self._bIdx >= self._batchSize:
+                    self._prepareRows(rows, executor)
+                    self._flushBatch(self._bIdx)
+                    self._bIdx = 0
 
-            if ix and ix % 1000 == 0:
-                print("[STEP {0}/{1}]: {2} s to process 1000 variants. ".format(
-                    ix, num_variants, time() - stepTime))
-                stepTime = time()
+                if ix and ix % 1000 == 0:
+                    print("[STEP {0}/{1}]: {2} s to process 1000 variants. ".format(
+                        ix, num_variants, time() - stepTime))
+                    stepTime = time()
 
-        if batchRefSeqs:
-            self._handleRefAltPredictions(batchRefSeqs, batchAltSeqs, batchIds)
+            self._prepareRows(rows, executor)
+            if self._bIdx:
+                self._flushBatch(self._bIdx)
+                self._bIdx = 0
+            for bufIdx in (self._curBuf, 1 - self._curBuf):
+                self._useBuffer(bufIdx)
+        finally:
+            # workers and pending predictions are waited for on errors too,
+            # so that no thread keeps using the buffers
+            if executor is not None:
+                executor.shutdown(wait = True)
+            self._predictor.shutdown(wait = True)
+            self._predictor = None
+            self._blockLoader.shutdown(wait = True)
+            self._blockLoader = None
+            self._nextRefBlock = (None, None)
+            self._predFutures = [None, None]
 
         for r in self._reporters:
-            r.write_to_file()
\ No newline at end of file
+            r.write_to_file()
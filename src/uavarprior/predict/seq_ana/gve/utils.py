@@ -5,6 +5,10 @@ Note
 This is originated from Selene's _variant_effect_prediction.py
 """
 
+import functools
+
+import numpy as np
+
 from fugep.data.utils import formatChrom 
 
 
@@ -143,5 +147,124 @@ def read_vcf_file(input_path,
     return variants
 
 
+def build_int_encoding_luts(bases_arr, base_to_index,
+                            complementary_base_dict, unk_base):
+    """
+    Build the lookup tables for representing sequences as 1-D arrays of
+    integer base codes instead of :math:`L \\times N` one-hot encodings.
+    Base `bases_arr[i]` is encoded as `i` and any other character is
+    encoded as :math:`N` (unknown).
+
+    Parameters
+    ----------
+    bases_arr : list(str)
+        The base ordering for the one-hot encoding
+    base_to_index : dict
+        A dict that maps input characters to indices, e.g.
+        `fugep.sequences.Genome.BASE_TO_INDEX`
+    complementary_base_dict : dict(str: str)
+        The dictionary that maps each base to its complement
+    unk_base : str
+        The base used to represent unknown positions
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+
+        * `tuple[0]` maps ASCII codes (0-255) to integer base codes
+        * `tuple[1]` is the :math:`(N + 1) \\times N` table mapping integer
+          base codes to the one-hot encoding, with :math:`1 / N` in every
+          column of the last (unknown) row as in `sequence_to_encoding`
+        * `tuple[2]` maps integer base codes to their complement
+        * `tuple[3]` maps integer base codes back to ASCII codes
+
+    """
+    n_bases = len(bases_arr)
+    ascii_lut = np.full(256, n_bases, dtype=np.int8)
+    for base, ix in base_to_index.items():
+        ascii_lut[ord(base)] = ix
+
+    one_hot = np.vstack([np.eye(n_bases, dtype=np.float32),
+                         np.full((1, n_bases), 1 / n_bases, dtype=np.float32)])
+
+    complement_lut = np.arange(n_bases + 1, dtype=np.int8)
+    for ix, base in enumerate(bases_arr):
+        complement_lut[ix] = base_to_index[complementary_base_dict[base]]
+
+    int_to_ascii = np.frombuffer(
+        (''.join(bases_arr) + unk_base).encode('ascii'), dtype=np.uint8)
+    return ascii_lut, one_hot, complement_lut, int_to_ascii
+
+
+@functools.lru_cache(maxsize=None)
+def _get_int_encoding_luts(bases, base_to_index, complementary_base_dict,
+                           unk_base):
+    luts = build_int_encoding_luts(list(bases), dict(base_to_index),
+                                   dict(complementary_base_dict), unk_base)
+    for lut in luts:
+        lut.setflags(write=False)
+    return luts
+
+
+def get_int_encoding_luts(reference_sequence):
+    """
+    Get the lookup tables of `build_int_encoding_luts` for the bases of
+    a reference sequence. The tables are built once for each distinct
+    set of bases and shared, hence read-only.
+
+    Parameters
+    ----------
+    reference_sequence : fugep.sequences.Sequence
+        The reference sequence (class or object), providing `BASES_ARR`,
+        `BASE_TO_INDEX`, `COMPLEMENTARY_BASE_DICT` and `UNK_BASE`
+
+    Returns
+    -------
+    tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        See `build_int_encoding_luts`
+
+    """
+    return _get_int_encoding_luts(
+        tuple(reference_sequence.BASES_ARR),
+        tuple(sorted(reference_sequence.BASE_TO_INDEX.items())),
+        tuple(sorted(reference_sequence.COMPLEMENTARY_BASE_DICT.items())),
+        reference_sequence.UNK_BASE)
+
+
+def seq_to_int(sequence, ascii_lut):
+    """
+    Convert a sequence to its integer base codes with a single lookup,
+    see `build_int_encoding_luts`.
+
+    Returns
+    -------
+    numpy.ndarray, dtype=numpy.int8
+        The integer base codes of the :math:`L` bases in the sequence
+
+    """
+    return ascii_lut[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+
+
+def seq_to_one_hot(sequence, ascii_lut, one_hot):
+    """
+    Convert a sequence to its one-hot encoding with two lookups, see
+    `build_int_encoding_luts`. The result is the same as that of
+    `sequence_to_encoding` of the reference sequence.
+
+    Returns
+    -------
+    numpy.ndarray
+        The :math:`L \\times N` one-hot encoding of the sequence
+
+    """
+    return one_hot[seq_to_int(sequence, ascii_lut)]
+
 
+def int_to_seq(codes, int_to_ascii):
+    """
+    Convert integer base codes back to the sequence they encode,
+    see `build_int_encoding_luts`.
+
+    """
+    return int_to_ascii[codes].tobytes().decode('ascii')
 
@@ -12,9 +12,9 @@ import warnings
 import yaml
 import six
 from collections import namedtuple
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Literal, Optional, Union
 import json
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ConfigDict, ValidationError
 
 SCIENTIFIC_NOTATION_REGEXP = r"^[\-\+]?(\d+\.?\d*|\d*\.?\d+)?[eE][\-\+]?\d+$"
 IS_INITIALIZED = False
@@ -326,6 +326,31 @@ class Config(BaseModel):
     data: DataConfig
     # Add more sections as needed
 
+class RunTrainingConfig(BaseModel):
+    """Schema of the training section read by `parse_configs_and_run`.
+    Unknown keys are rejected, as they are likely misspelled. Fields can
+    be set to null explicitly."""
+    model_config = ConfigDict(extra='forbid')
+
+    lr: Optional[float] = None
+    max_steps: Optional[int] = None
+    batch_size: Optional[int] = 64
+    data_parallel: Optional[bool] = False
+    logging_verbosity: Optional[int] = 2
+    metrics: Optional[list] = []
+
+class RunConfig(BaseModel):
+    """Schema of the configuration read by `parse_configs_and_run`.
+    Other top level keys, such as the sections read by `execute`, are
+    ignored. The model and sampler sections are instantiated or read
+    elsewhere and passed on as given."""
+    model: Any = {}
+    training: RunTrainingConfig = RunTrainingConfig()
+    sampler: Any = None
+    output_dir: Optional[str] = None
+    lr: Optional[float] = None
+    mode: Literal["train", "evaluate", "predict"] = "train"
+
 def load_path(path: str, instantiate: bool = False) -> Dict[str, Any]:
     """Load configuration from a file path.
     
@@ -4,55 +4,103 @@ running operations in _Selene_.
 
 """
 import os
+import functools
+import hashlib
 import importlib
+import importlib.util
 import sys
 import re
-from time import strftime
-import types
-import torch
-import torch.nn as nn
-import random
-import numpy as np
+import weakref
+from collections import ChainMap
+from collections.abc import Mapping
 import inspect
-
-# import torchinfo  # Temporarily commented out
-import torch.multiprocessing as mp
-
-# from tensorflow.keras.models import Model
-
-from . import instantiate
-from ..model import loadNnModule
-from ..model import loadWrapperModule
-from ..model.nn.utils import load_model, add_output_layers, make_dir
-
-from torch.distributed import init_process_group, destroy_process_group
 from datetime import timedelta
 import logging
 from typing import Dict, Any
-import torch
 
-from uavarprior.model import get_model
-# Commented out missing imports to fix compatibility issues
-# Original import: from uavarprior.data import get_dataset, get_dataloader
-# Fixed import: changed training to train and Trainer to StandardSGDTrainer
-from uavarprior.train import StandardSGDTrainer
+# torch, the model and the train modules are imported in the functions 
+# using them, so that loading this module stays cheap for operations 
+# that do not need them
+
+from . import instantiate
+from .config import RunConfig
 
-from .helper import try_import_peakgvarevaluator
+from .helper import module_exists
 
 logger = logging.getLogger(__name__)
 
+# class path given by an `!obj:` YAML tag
+_OBJ_TAG_RE = re.compile(r'!obj:([\w\.]+)')
+
+# modules to look up the analyzer class in, most specific first
+_ANALYZER_CANDIDATES = (
+    "src.uavarprior.predict.seq_ana.gve",
+    "uavarprior.predict.seq_ana.gve",
+    "src.uavarprior.predict.seq_ana",
+    "uavarprior.predict.seq_ana",
+    "src.uavarprior.predict",  # Legacy paths as fallback
+    "uavarprior.predict",
+)
+
+# default analyzer classes, tried when the config does not give one
+_ANALYZER_FALLBACK_PATHS = tuple(f"{path}.PeakGVarEvaluator"
+                                 for path in _ANALYZER_CANDIDATES)
+
+# analyzer call for each type of analysis, in order of precedence, called
+# with the analyzer and the analysis config
+_ANALYSIS_DISPATCH = {
+    "variant_effect_prediction": lambda analyzer, kwargs: analyzer.evaluate(),
+    "in_silico_mutagenesis": lambda analyzer, kwargs: analyzer.evaluate(**kwargs),
+    "prediction": lambda analyzer, kwargs: analyzer.predict(**kwargs),
+}
+
+# keys of the analyses, any of which with an analyzer makes an analyze-only
+# config
+_ANALYZE_KEYS = frozenset(_ANALYSIS_DISPATCH)
+
+# PeakGVarEvaluator class, resolved on first use
+_PEAKGVAR_CLS = None
+
+# NonStrandSpecific class, imported on first use
+_NON_STRAND_SPECIFIC_CLS = None
+
+# modules loaded from user given model files and directories
+_USER_MODULE_CACHE = dict()
+
+# names of the arguments accepted by model classes
+_MODEL_ARG_CACHE = weakref.WeakKeyDictionary()
+
 def ddp_setup(rank, world_size):
     """
     Args:
         rank: Unique identifier of each process
         world_size: Total number of processes
+
+    Uses the NCCL backend when CUDA is available and the platform supports
+    it, and Gloo otherwise. Nothing is done for a single process.
     """
-    os.environ["MASTER_ADDR"] = "localhost"
-    os.environ["MASTER_PORT"] = "12355"
-    init_process_group(backend="nccl", rank=rank,
+    if world_size <= 1:
+        return
+
+    import torch
+    from torch.distributed import init_process_group
+
+    # keep addresses given by the launcher
+    os.environ.setdefault("MASTER_ADDR", "localhost")
+    os.environ.setdefault("MASTER_PORT", "12355")
+    kwargs = dict()
+    if torch.cuda.is_available() and sys.platform != "win32":
+        backend = "nccl"
+        # the device must be set before the process group is created
+        torch.cuda.set_device(rank)
+        if 'device_id' in inspect.signature(init_process_group).parameters:
+            # binds the process group to the device, available in torch>=2.3
+            kwargs['device_id'] = torch.device(f"cuda:{rank}")
+    else:
+        backend = "gloo"
+    init_process_group(backend=backend, rank=rank,
                        world_size=world_size,
-                       timeout=timedelta(minutes=30))
-    torch.cuda.set_device(rank)
+                       timeout=timedelta(minutes=30), **kwargs)
 
 def class_instantiate(classobj):
     """Not used currently, but might be useful later for recursive
@@ -76,14 +124,27 @@ def module_from_file(path):
 
     Returns
     -------
-    The loaded module
+    The loaded module. The module is loaded again only if the file was
+    modified since.
 
     """
-    parent_path, module_file = os.path.split(path)
-    loader = importlib.machinery.SourceFileLoader(
-        module_file[:-3], path)
-    module = types.ModuleType(loader.name)
-    loader.exec_module(module)
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path))
+    module = _USER_MODULE_CACHE.get(key)
+    if module is not None:
+        return module
+    # registered under a name unique to the path, so that user files do
+    # not replace modules of the same name
+    name = "_uavarprior_user_" + hashlib.sha1(path.encode()).hexdigest()
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+    _USER_MODULE_CACHE[key] = module
     return module
 
 
@@ -104,9 +165,64 @@ def module_from_dir(path):
     -------
     The loaded module
     """
+    path = os.path.abspath(path)
+    module = _USER_MODULE_CACHE.get(path)
+    if module is not None:
+        return module
     parent_path, module_dir = os.path.split(path)
-    sys.path.insert(0, parent_path)
-    return importlib.import_module(module_dir)
+    if parent_path not in sys.path:
+        sys.path.insert(0, parent_path)
+    module = importlib.import_module(module_dir)
+    _USER_MODULE_CACHE[path] = module
+    return module
+
+def _seed_rngs(seed, strict=False):
+    """
+    Seed the Python, NumPy and torch random number generators.
+
+    Parameters
+    ----------
+    seed : int
+        The random seed.
+    strict : bool, optional
+        Default is False. If True, also restrict torch to deterministic
+        algorithms, which can be much slower on GPUs.
+
+    """
+    import random
+    import numpy as np
+    import torch
+
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    torch.cuda.manual_seed_all(seed)
+    if strict:
+        torch.use_deterministic_algorithms(True)
+
+def _xavier_init(m):
+    """
+    Xavier initialization of the weights of linear and 1D convolution
+    layers, with zero biases. To be applied to a model with `model.apply`.
+    """
+    from torch import nn
+
+    if isinstance(m, (nn.Linear, nn.Conv1d)):
+        nn.init.xavier_uniform_(m.weight)
+        bias = m.bias
+        if bias is not None:
+            nn.init.zeros_(bias)
+
+def _expected_args(model_class):
+    """
+    Get the names of the arguments accepted by a model class, cached per
+    class.
+    """
+    cached = _MODEL_ARG_CACHE.get(model_class)
+    if cached is None:
+        cached = frozenset(inspect.signature(model_class).parameters)
+        _MODEL_ARG_CACHE[model_class] = cached
+    return cached
 
 def _getModelInfo(configs, sampler):
     '''
@@ -157,10 +273,15 @@ def initialize_model(model_configs, train=True, lr=None, configs=None):
         If `train` but the `lr` specified is not a float.
 
     """
+    from ..model import loadNnModule
+    from ..model.nn.utils import make_dir
+
     if model_configs["built"] == 'pytorch':
+        import torch
+
         model_class_name = model_configs["class"]
 
-        if 'path' in model_configs.keys():
+        if 'path' in model_configs:
             # load network module from user given file
             import_model_from = model_configs["path"]
             if os.path.isdir(import_model_from):
@@ -173,28 +294,20 @@ def initialize_model(model_configs, train=True, lr=None, configs=None):
 
         model_class = getattr(module, model_class_name)
         ### Get only exprected arguments and ignore extra args
-        model_class_expected_argset = set(inspect.getargspec(model_class).args)
-        model_class_args = {k: model_configs["classArgs"][k] for k in model_class_expected_argset if k in model_configs["classArgs"]}
+        model_class_expected_argset = _expected_args(model_class)
+        class_args = model_configs["classArgs"]
+        model_class_args = {k: class_args[k] for k in model_class_expected_argset if k in class_args}
 
         # model = model_class(**model_configs["classArgs"])
         model = model_class(**model_class_args)
 
-        def xavier_initialize(m):
-            if isinstance(m, nn.Linear):
-                nn.init.xavier_uniform_(m.weight)
-                if m.bias is not None:
-                    nn.init.zeros_(m.bias)
-            elif isinstance(m, nn.Conv1d):
-                nn.init.xavier_uniform_(m.weight)
-                if m.bias is not None:
-                    nn.init.zeros_(m.bias)
-
-        if 'xavier_init' in model_configs:
-            model.apply(xavier_initialize)
+        if model_configs.get('xavier_init'):
+            with torch.no_grad():
+                model.apply(_xavier_init)
 
 
         if "non_strand_specific" in model_configs:
-            from uavarprior.model import NonStrandSpecific
+            NonStrandSpecific = _get_non_strand_specific()
             model = NonStrandSpecific(
                 model, mode=model_configs["non_strand_specific"])
 
@@ -208,106 +321,17 @@ def initialize_model(model_configs, train=True, lr=None, configs=None):
         # optimizer for training
         optim_class, optim_kwargs = None, None
         if train:
-            if isinstance(lr, float):
-                optim_class, optim_kwargs = module.get_optimizer(lr)
-            elif lr is not None:
-                # Try to convert lr to float if possible
-                try:
-                    lr_float = float(lr)
-                    logger.info(f"Converting learning rate from {type(lr).__name__} ({lr}) to float ({lr_float})")
-                    optim_class, optim_kwargs = module.get_optimizer(lr_float)
-                except (ValueError, TypeError):
-                    logger.error(f"Failed to convert learning rate value: {lr} (type: {type(lr).__name__})")
-                    raise ValueError("Learning rate must be convertible to a float "
-                                     f"but was {lr} of type {type(lr).__name__}")
-            else:
+            if lr is None:
                 # If we're in training mode but no learning rate provided, this is an error
                 raise ValueError("Learning rate must be specified for training mode")
-        # elif train:
-        #     # This branch should never be reached with our new changes above
-        #     optim_class, optim_kwargs = module.get_optimizer(lr)
-    # elif model_configs["built"] == 'tensorflow':
-    #     model_class_name = model_configs["class"]
-    #     # model_built_name = model_configs["built"]
-    #
-    #     module = None
-    #     if 'path' in model_configs.keys():
-    #         # load network module from user given file
-    #         import_model_from = model_configs["path"]
-    #         if os.path.isdir(import_model_from):
-    #             module = module_from_dir(import_model_from)
-    #         else:
-    #             module = module_from_file(import_model_from)
-    #     else:
-    #         # load built in network module
-    #         module = loadNnModule(model_class_name)
-    #
-    #     model_class = getattr(module, model_class_name)
-    #
-    #     model_class_expected_argset = set(inspect.getargspec(model_class).args)
-    #     # model_class_args = {k: model_configs["classArgs"][k] for k in model_class_expected_argset if
-    #     #                     k in model_configs["classArgs"]}
-    #
-    #
-    #     model_builder = model_class(**model_configs["classArgs"])
-    #     # model_builder = model_class(**model_class_args)
-    #     dna_wlen = model_configs["dna_wlen"]
-    #     dna_inputs = model_builder.inputs(dna_wlen)
-    #     stem = model_builder(dna_inputs)
-    #     output_names = model_configs['output_names']
-    #
-    #     # loss function
-    #     if 'criterionArgs' in model_configs:
-    #         criterionArgs = model_configs['criterionArgs']
-    #     else:
-    #         criterionArgs = dict()
-    #     criterion = module.criterion(**criterionArgs)
-    #
-    #     outputs = add_output_layers(stem.outputs[0], output_names,
-    #                                 loss_fn=criterion)
-    #     # from tensorflow.keras.models import Model
-    #     model = Model(inputs=stem.inputs, outputs=outputs, name=stem.name)
-    #
-    #     if "non_strand_specific" in model_configs:
-    #         from uavarprior.model import NonStrandSpecific
-    #         model = NonStrandSpecific(
-    #             model, mode=model_configs["non_strand_specific"])
-    #
-    #
-    #
-    #     # optimizer for training
-    #     optim_class, optim_kwargs = None, None
-    #     if train and isinstance(lr, float):
-    #         optim_class, optim_kwargs = module.get_optimizer(lr)
-    #     elif train:
-    #         raise ValueError("Learning rate must be specified as a float "
-    #                          "but was {0}".format(lr))
-
-        # if 'path' in model_configs.keys():
-        #     model = load_model(model_configs["path"])
-        #
-        # model_class_name = model_configs["class"]
-        # module = loadNnModule(model_class_name)
-        # # TO DO: raise error when non strand specific in configuration variables
-        # # if "non_strand_specific" in model_configs:
-        # #     from uavarprior.model import NonStrandSpecific
-        # #     model = NonStrandSpecific(
-        # #         model, mode=model_configs["non_strand_specific"])
-        #
-        # # loss function
-        # if 'criterionArgs' in model_configs:
-        #     criterionArgs = model_configs['criterionArgs']
-        # else:
-        #     criterionArgs = dict()
-        # criterion = module.criterion(**criterionArgs)
-        #
-        # # optimizer for training
-        # optim_class, optim_kwargs = None, None
-        # if train and isinstance(lr, float):
-        #     optim_class, optim_kwargs = module.get_optimizer(lr)
-        # elif train:
-        #     raise ValueError("Learning rate must be specified as a float "
-        #                      "but was {0}".format(lr))
+            try:
+                lr_float = float(lr)
+            except (ValueError, TypeError):
+                raise ValueError("Learning rate must be convertible to a float "
+                                 f"but was {lr!r} of type {type(lr).__name__}")
+            optim_class, optim_kwargs = module.get_optimizer(lr_float)
+    else:
+        raise ValueError(f"Unsupported model framework: {model_configs['built']}")
 
     # construct model wrapper
     if 'plot_grads' in model_configs:
@@ -317,10 +341,7 @@ def initialize_model(model_configs, train=True, lr=None, configs=None):
             make_dir(gradOutDir)
     else:
         gradOutDir = None
-    if 'rank' in model_configs.keys():
-        rank = model_configs['rank']
-    else:
-        rank = None
+    rank = model_configs.get('rank')
 
     modelWrapper = initializeWrapper(model_configs['wrapper'], 
          mode = 'train', model = model, loss = criterion,
@@ -338,6 +359,8 @@ def initializeWrapper(className, mode, model, loss, model_built = 'pytorch', mul
     '''
     Initialize model wrapper
     '''
+    from ..model import loadWrapperModule
+
     wrapperClass = getattr(loadWrapperModule(className), className)
     wrapper = wrapperClass(model, mode = mode, lossCalculator = loss,
                            model_built = model_built, mult_predictions=mult_predictions,
@@ -347,84 +370,57 @@ def initializeWrapper(className, mode, model, loss, model_built = 'pytorch', mul
                 )
     return wrapper
     
-# Helper functions for class importing to be used in execute()
-def _import_class(class_path):
-    """Helper to import a class from its string path"""
-    if class_path is None:
-        logger.debug("Class path is None, cannot import")
-        return None
-        
-    if '.' in class_path:
-        try:
-            module_path, class_name = class_path.rsplit('.', 1)
-            logger.debug(f"Importing module: {module_path}, class: {class_name}")
-
-            # Define possible import paths based on module_path
-            base_path = module_path.replace('src.', '').replace('uavarprior.', '')
-            possible_paths = [
-                f"src.uavarprior.{base_path}",  # Most specific path first
-                f"uavarprior.{base_path}",
-                f"src.uavarprior.{base_path.rsplit('.', 1)[0]}",  # Try parent package
-                f"uavarprior.{base_path.rsplit('.', 1)[0]}",
-                "src.uavarprior",  # Legacy paths as fallback
-                "uavarprior"
-            ]
-
-            # Try each import path in order
-            for try_path in possible_paths:
-                try:
-                    logger.debug(f"Attempting import from {try_path}")
-                    module = importlib.import_module(try_path)
-                    if hasattr(module, class_name):
-                        return getattr(module, class_name)
-                except (ImportError, AttributeError) as e:
-                    logger.debug(f"Import failed for {try_path}: {e}")
-                    continue
-                    
-            logger.debug(f"All import attempts failed for {class_path}")
-            return None
-            
-        except Exception as e:
-            logger.debug(f"Error parsing class path {class_path}: {e}")
-            return None
-    else:
-        # If no module path is specified, assume it's a class in the current module
-        logger.debug(f"No module specified, treating {class_path} as a simple class name")
-        # This is handled by _import_from_module, so return None
-        return None
-        
-def _import_from_module(module_path, class_name):
-    """Helper to import a specific class from a module"""
-    if module_path is None or class_name is None:
-        logger.debug("Module path or class name is None, cannot import")
-        return None
-        
-    logger.debug(f"Importing from module: {module_path}, class: {class_name}")
-    
-    # Define possible import paths based on module_path
-    base_path = module_path.replace('src.', '').replace('uavarprior.', '')
-    possible_paths = [
-        f"src.uavarprior.{base_path}",  # Most specific path first
-        f"uavarprior.{base_path}",
-        f"src.uavarprior.{base_path.rsplit('.', 1)[0] if '.' in base_path else base_path}",  # Try parent package
-        f"uavarprior.{base_path.rsplit('.', 1)[0] if '.' in base_path else base_path}",
-        "src.uavarprior",  # Legacy paths as fallback
-        "uavarprior"
-    ]
-    
-    # Try each import path in order
-    for try_path in possible_paths:
+def _get_peakgvar_cls():
+    """
+    Get the PeakGVarEvaluator class, trying the paths of
+    _ANALYZER_FALLBACK_PATHS in order. Modules that cannot be found are
+    skipped without attempting the import. The class is resolved once per
+    process and kept in _PEAKGVAR_CLS. Raises ImportError listing the
+    failed attempts if no path works.
+    """
+    global _PEAKGVAR_CLS
+    if _PEAKGVAR_CLS is not None:
+        return _PEAKGVAR_CLS
+    # (path, error) of the failed attempts, reported at once
+    attempts = []
+    modules = sys.modules
+    for path in _ANALYZER_FALLBACK_PATHS:
+        module_path = path.rsplit('.', 1)[0]
+        if module_path not in modules and not module_exists(module_path):
+            attempts.append((path, "module not found"))
+            continue
         try:
-            logger.debug(f"Attempting import from {try_path}")
-            module = importlib.import_module(try_path)
-            if hasattr(module, class_name):
-                return getattr(module, class_name)
+            _PEAKGVAR_CLS = _resolve_analyzer_cls(path)
+            logger.info("Found PeakGVarEvaluator at %s", path)
+            return _PEAKGVAR_CLS
         except (ImportError, AttributeError) as e:
-            logger.debug(f"Import failed for {try_path}: {e}")
-            continue
-            
-    logger.debug(f"All import attempts failed for {class_name} from {module_path}")
-    return None
+            attempts.append((path, repr(e)))
+    raise ImportError("Could not import PeakGVarEvaluator from any "
+                      f"known location, attempts: {attempts}")
+
+def _get_non_strand_specific():
+    """
+    Get the NonStrandSpecific model class, which is imported once per
+    process.
+    """
+    global _NON_STRAND_SPECIFIC_CLS
+    if _NON_STRAND_SPECIFIC_CLS is None:
+        from ..model import NonStrandSpecific
+        _NON_STRAND_SPECIFIC_CLS = NonStrandSpecific
+    return _NON_STRAND_SPECIFIC_CLS
+
+@functools.lru_cache(maxsize=None)
+def _resolve_analyzer_cls(dotted_path):
+    """
+    Get the class at a dotted path, using the module from sys.modules if
+    it is already imported. Successful lookups are memoized, failed ones
+    raise ImportError or AttributeError.
+    """
+    module_path, class_name = dotted_path.rsplit('.', 1)
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = importlib.import_module(module_path)
+    return getattr(module, class_name)
 
 def execute(configs):
     """
@@ -461,6 +457,12 @@ def execute(configs):
     output_dir = configs['output_dir']
     for op in configs['ops']:
         if op == "train":
+            # seed before the sampler and model are built
+            random_seed = configs.get("random_seed")
+            if random_seed is not None:
+                _seed_rngs(random_seed,
+                           strict=configs.get("strict_determinism", False))
+
             # ddp_setup(rank, world_size=torch.cuda.device_count())
             # construct sampler
             sampler_info = configs["sampler"]
@@ -480,14 +482,15 @@ def execute(configs):
             
             # create trainer
             train_model_info = configs["train_model"]
-            train_model_info.bind(model = model, dataSampler = sampler)
-            if sampler.getValOfMisInTarget() is not None:
-                train_model_info.bind(valOfMisInTarget = sampler.getValOfMisInTarget())
-            
+            bind_kwargs = dict(model = model, dataSampler = sampler)
+            valOfMisInTarget = sampler.getValOfMisInTarget()
+            if valOfMisInTarget is not None:
+                bind_kwargs['valOfMisInTarget'] = valOfMisInTarget
             if output_dir is not None:
-                train_model_info.bind(outputDir = output_dir)
-            if "random_seed" in configs:
-                train_model_info.bind(deterministic=True)
+                bind_kwargs['outputDir'] = output_dir
+            if random_seed is not None:
+                bind_kwargs['deterministic'] = True
+            train_model_info.bind(**bind_kwargs)
 
             modelTrainer = instantiate(train_model_info)
             
@@ -509,11 +512,13 @@ def execute(configs):
                 
                 # construct evaluator  
                 evaluate_model_info = configs["evaluate_model"]
-                evaluate_model_info.bind(model = model, dataSampler = sampler)
+                bind_kwargs = dict(model = model, dataSampler = sampler)
                 if output_dir is not None:
-                    evaluate_model_info.bind(outputDir = output_dir)
-                if sampler.getValOfMisInTarget() is not None:
-                    evaluate_model_info.bind(valOfMisInTarget = sampler.getValOfMisInTarget())
+                    bind_kwargs['outputDir'] = output_dir
+                valOfMisInTarget = sampler.getValOfMisInTarget()
+                if valOfMisInTarget is not None:
+                    bind_kwargs['valOfMisInTarget'] = valOfMisInTarget
+                evaluate_model_info.bind(**bind_kwargs)
                 evaluate_model = instantiate(evaluate_model_info)
                 
                 # evaluate
@@ -523,298 +528,195 @@ def execute(configs):
             logger.info("Processing analyze operation")
             if not model:
                 logger.info("No model already loaded, initializing model from config")
-                try:
-                    # lr=None because we don't need optimizer for analysis
-                    model_config = configs["model"]
-                    # Add debugging information
-                    logger.debug(f"Model config before initialization: {model_config}")
-                    
-                    # Check if model_config is a dictionary and has required fields
-                    if isinstance(model_config, dict) and "built" in model_config and "wrapper" in model_config:
-                        model = initialize_model(model_config, train=False, lr=None, configs=configs)
-                        logger.info("Model initialized successfully")
-                    else:
-                        # More detailed error message for debugging
-                        logger.error(f"Invalid model configuration: {model_config}")
-                        raise ValueError(f"Model configuration must be a dictionary with 'built' and 'wrapper' keys")
-                except Exception as e:
-                    logger.error(f"Failed to initialize model: {str(e)}")
-                    raise
+                # lr=None because we don't need optimizer for analysis
+                model_config = configs["model"]
+                # Add debugging information
+                logger.debug("Model config before initialization: %s", model_config)
+                
+                # Check if model_config is a dictionary and has required fields
+                if isinstance(model_config, Mapping) and "built" in model_config and "wrapper" in model_config:
+                    model = initialize_model(model_config, train=False, lr=None, configs=configs)
+                    logger.info("Model initialized successfully")
+                else:
+                    raise ValueError("Model configuration must be a dictionary with 'built' and "
+                                     f"'wrapper' keys, got: {model_config!r}")
             
             # construct analyzer
             logger.info("Setting up analyzer")
             analyze_seqs_info = configs["analyzer"]
             
-            # Check if analyze_seqs_info is a proxy object or a dict
+            # Check if analyze_seqs_info is a proxy object or a mapping
             if hasattr(analyze_seqs_info, 'bind'):
                 # It's a _Proxy object with bind method
-                analyze_seqs_info.bind(model=model)
+                bind_kwargs = dict(model=model)
                 if output_dir is not None:
-                    analyze_seqs_info.bind(outputDir=output_dir)
+                    bind_kwargs['outputDir'] = output_dir
+                analyze_seqs_info.bind(**bind_kwargs)
                 analyze_seqs = instantiate(analyze_seqs_info)
-            else:
-                # It's a plain dict, we need to add model and outputDir to the dict
+            elif isinstance(analyze_seqs_info, Mapping):
+                # It's a mapping, we need to add model and outputDir to the
+                # arguments, overlaid so that the config itself is not modified
                 logger.info("Analyzer config is a dictionary, adding parameters directly")
-                if isinstance(analyze_seqs_info, dict):
-                    analyze_seqs_info['model'] = model
-                    if output_dir is not None:
-                        analyze_seqs_info['outputDir'] = output_dir
-                    # Now instantiate the class directly
-                    try:
-                        # Store a copy of the original class path before popping it
-                        original_class_path = analyze_seqs_info.get('class')
-                        logger.info(f"Original class path from config: {original_class_path}")
-                        
-                        # CRITICAL FIX: Keep a copy of the original analyzer config before modifying
-                        original_analyze_seqs_info = analyze_seqs_info.copy()
-                        
-                        # Use the class name from the dict directly
-                        class_path = analyze_seqs_info.pop('class', None)
-                        
-                        # Check for '!obj:' tag pattern in the original analyzer config or in the configs
-                        if not class_path:
-                            # First try to get from the original analyzer config
-                            yaml_repr = str(original_analyze_seqs_info)
-                            logger.debug(f"Checking for !obj: tag in: {yaml_repr}")
-                            if '!obj:' in yaml_repr:
-                                # Try to extract from YAML tag if available
-                                match = re.search(r'!obj:([\w\.]+)', yaml_repr)
-                                if match:
-                                    class_path = match.group(1)
-                                    logger.info(f"Extracted class path from analyzer !obj: tag: {class_path}")
-                                else:
-                                    # If we know it's a YAML tag but couldn't extract, log more details
-                                    logger.warning(f"Found !obj: tag but couldn't extract class path. Raw config: {yaml_repr}")
-                            
-                            # If still no class_path, check the full configs
-                            if not class_path and isinstance(configs["analyzer"], str):
-                                raw_analyzer = configs["analyzer"]
-                                logger.debug(f"Checking raw analyzer string: {raw_analyzer}")
-                                match = re.search(r'!obj:([\w\.]+)', raw_analyzer)
-                                if match:
-                                    class_path = match.group(1)
-                                    logger.info(f"Extracted class path from raw config !obj: tag: {class_path}")
-                        
-                        # For PeakGVarEvaluator, check if it's a typical class name without module prefix
-                        if class_path and class_path.endswith("PeakGVarEvaluator") and "." not in class_path:
-                            logger.info(f"Detected bare PeakGVarEvaluator class name, assuming src.uavarprior.predict.seq_ana.gve.PeakGVarEvaluator")
-                            class_path = f"src.uavarprior.predict.seq_ana.gve.{class_path}"
-                        # If it's uavarprior.predict.PeakGVarEvaluator, convert to the correct path 
-                        elif class_path and "uavarprior.predict.PeakGVarEvaluator" in class_path and "seq_ana" not in class_path:
-                            new_class_path = class_path.replace("uavarprior.predict.PeakGVarEvaluator", "uavarprior.predict.seq_ana.gve.PeakGVarEvaluator")
-                            logger.info(f"Fixed class path from {class_path} to {new_class_path}")
-                            class_path = new_class_path
-                        
-                        logger.info(f"Final extracted class path: {class_path}")
-                        
-                        if class_path:
-                            logger.info(f"Instantiating analyzer from class path: {class_path}")
-                            # Store original for error reporting
-                            original_analyzer_config = {
-                                'class': original_class_path,
-                                **analyze_seqs_info
-                            }
-                            class_obj = None
-                            exceptions = []
-                            
-                            # Try multiple import strategies in order
-                            import_strategies = [
-                                # Strategy 1: Import from GVE module directly (most specific path)
-                                lambda: _import_from_module("src.uavarprior.predict.seq_ana.gve", "PeakGVarEvaluator"),
-                                lambda: _import_from_module("uavarprior.predict.seq_ana.gve", "PeakGVarEvaluator"),
-                                
-                                # Strategy 2: Import from seq_ana package
-                                lambda: _import_from_module("src.uavarprior.predict.seq_ana", "PeakGVarEvaluator"),
-                                lambda: _import_from_module("uavarprior.predict.seq_ana", "PeakGVarEvaluator"),
-                                
-                                # Strategy 3: Legacy - try predict module directly
-                                lambda: _import_from_module("src.uavarprior.predict", "PeakGVarEvaluator"),
-                                lambda: _import_from_module("uavarprior.predict", "PeakGVarEvaluator"),
-                            ]
-
-                            # Try each strategy until one works
-                            success = False
-                            last_error = None
-                            for strategy in import_strategies:
-                                try:
-                                    logger.debug(f"Trying import strategy: {strategy.__name__ if hasattr(strategy, '__name__') else 'anonymous'}")
-                                    analyzer_cls = strategy()
-                                    if analyzer_cls is not None:
-                                        analyze_seqs = analyzer_cls(**analyze_seqs_info)
-                                        success = True
-                                        logger.info(f"Successfully imported PeakGVarEvaluator using strategy {strategy.__name__ if hasattr(strategy, '__name__') else 'anonymous'}")
-                                        break
-                                except Exception as e:
-                                    last_error = e
-                                    logger.debug(f"Import strategy failed: {e}")
-                                    continue
-
-                            if not success:
-                                error_msg = f"All import strategies failed. Last error: {last_error}"
-                                logger.error(error_msg)
-                                raise ImportError(error_msg)
+                overlay = {'model': model}
+                if output_dir is not None:
+                    overlay['outputDir'] = output_dir
+                merged = ChainMap(overlay, analyze_seqs_info)
+                # Now instantiate the class directly
+                # Use the class name from the dict directly
+                class_path = analyze_seqs_info.get('class')
+                logger.debug("Original class path from config: %s", class_path)
+                analyzer_kwargs = {k: v for k, v in merged.items() if k != 'class'}
+                
+                # Check for '!obj:' tag pattern in the original analyzer config or in the configs
+                if not class_path:
+                    # First try to get from the original analyzer config
+                    yaml_repr = str(analyze_seqs_info)
+                    logger.debug("Checking for !obj: tag in: %s", yaml_repr)
+                    if '!obj:' in yaml_repr:
+                        # Try to extract from YAML tag if available
+                        match = _OBJ_TAG_RE.search(yaml_repr)
+                        if match:
+                            class_path = match.group(1)
+                            logger.debug("Extracted class path from analyzer !obj: tag: %s", class_path)
                         else:
-                            logger.error("No class path found in configuration")
-                            logger.error(f"Original analyzer configuration: {original_analyze_seqs_info}")
-                            
-                            # Try a hard-coded default as a last-ditch effort
-                            default_class_path = "src.uavarprior.predict.seq_ana.gve.PeakGVarEvaluator"
-                            logger.info(f"Attempting to use default analyzer: {default_class_path}")
-                            
-                            try:
-                                # Try multiple import strategies for the default class path in specified order
-                                successful_import = False
-                                import_paths = [
-                                    "src.uavarprior.predict.seq_ana.gve",  # Most specific path first
-                                    "uavarprior.predict.seq_ana.gve",  
-                                    "src.uavarprior.predict.seq_ana",  # Try seq_ana package
-                                    "uavarprior.predict.seq_ana",
-                                    "src.uavarprior.predict",  # Legacy paths as fallback 
-                                    "uavarprior.predict"
-                                ]
-                                
-                                for import_path in import_paths:
-                                    try:
-                                        logger.debug(f"Trying to import PeakGVarEvaluator from {import_path}")
-                                        module = importlib.import_module(import_path)
-                                        if hasattr(module, "PeakGVarEvaluator"):
-                                            logger.info(f"Found PeakGVarEvaluator in {import_path}")
-                                            analyze_seqs = module.PeakGVarEvaluator(**analyze_seqs_info)
-                                            successful_import = True
-                                            break
-                                    except ImportError as e:
-                                        logger.debug(f"Could not import module {import_path}: {e}")
-                                        # Continue to next path
-                                        continue
-                                
-                                if not successful_import:
-                                    logger.info("All module imports failed, trying with individual class paths")
-                                    class_paths = [
-                                        "src.uavarprior.predict.seq_ana.gve.PeakGVarEvaluator",
-                                        "uavarprior.predict.seq_ana.gve.PeakGVarEvaluator"
-                                    ]
-                                    for path in class_paths:
-                                        try:
-                                            logger.debug(f"Attempting direct class import from {path}")
-                                            cls = _import_class(path)
-                                            if cls:
-                                                logger.info(f"Successfully imported PeakGVarEvaluator from {path}")
-                                                analyze_seqs = cls(**analyze_seqs_info)
-                                                successful_import = True
-                                                break
-                                        except Exception as e:
-                                            logger.debug(f"Direct class import failed from {path}: {e}")
-                                
-                                if not successful_import:
-                                    raise ImportError("Could not import PeakGVarEvaluator from any known location")
-                            except Exception as e:
-                                logger.error(f"Failed to use default analyzer: {e}")
-                                logger.error("Please update your configuration to include a valid 'class' property in the 'analyzer' section")
-                                raise ValueError("Could not determine analyzer class from configuration. Make sure 'class' is specified in the analyzer configuration.")
-                    except Exception as e:
-                        logger.error(f"Failed to instantiate analyzer: {str(e)}")
-                        raise
+                            # If we know it's a YAML tag but couldn't extract, log more details
+                            logger.warning("Found !obj: tag but couldn't extract class path. Raw config: %s", yaml_repr)
+
+                
+                # For PeakGVarEvaluator, check if it's a typical class name without module prefix
+                if class_path and class_path.endswith("PeakGVarEvaluator") and "." not in class_path:
+                    logger.debug("Detected bare PeakGVarEvaluator class name, assuming src.uavarprior.predict.seq_ana.gve.PeakGVarEvaluator")
+                    class_path = f"src.uavarprior.predict.seq_ana.gve.{class_path}"
+                # If it's uavarprior.predict.PeakGVarEvaluator, convert to the correct path 
+                elif class_path and "uavarprior.predict.PeakGVarEvaluator" in class_path and "seq_ana" not in class_path:
+                    new_class_path = class_path.replace("uavarprior.predict.PeakGVarEvaluator", "uavarprior.predict.seq_ana.gve.PeakGVarEvaluator")
+                    logger.debug("Fixed class path from %s to %s", class_path, new_class_path)
+                    class_path = new_class_path
+                
+                logger.debug("Final extracted class path: %s", class_path)
+                
+                if class_path:
+                    logger.info("Instantiating analyzer from class path: %s", class_path)
+                    analyze_seqs = _get_peakgvar_cls()(**analyzer_kwargs)
                 else:
-                    raise TypeError(f"Expected analyzer config to be a dict or proxy object, got {type(analyze_seqs_info).__name__}")
+                    logger.error("No class path found in configuration. "
+                                 "Original analyzer configuration: %s", analyze_seqs_info)
+                    
+                    # Try a hard-coded default as a last-ditch effort
+                    default_class_path = "src.uavarprior.predict.seq_ana.gve.PeakGVarEvaluator"
+                    logger.info("Attempting to use default analyzer: %s", default_class_path)
+                    
+                    try:
+                        analyzer_cls = _get_peakgvar_cls()
+                    except ImportError as e:
+                        raise ValueError("Could not determine analyzer class from configuration. Make sure 'class' is specified in the analyzer configuration. "
+                                         f"Default analyzer failed with: {e}") from e
+                    analyze_seqs = analyzer_cls(**analyzer_kwargs)
+            else:
+                raise TypeError(f"Expected analyzer config to be a mapping or proxy object, got {type(analyze_seqs_info).__name__}")
             
             logger.info("Analyzer set up complete, determining analysis type")
-            if "variant_effect_prediction" in configs:
-                logger.info("Running variant effect prediction analysis")
-                analyze_seqs.evaluate()
-            elif "in_silico_mutagenesis" in configs:
-                logger.info("Running in silico mutagenesis")
-                ism_info = configs["in_silico_mutagenesis"]
-                analyze_seqs.evaluate(**ism_info)
-            elif "prediction" in configs:
-                logger.info("Running prediction")
-                predict_info = configs["prediction"]
-                analyze_seqs.predict(**predict_info)
+            for analysis, run_analysis in _ANALYSIS_DISPATCH.items():
+                if analysis in configs:
+                    logger.info("Running %s", analysis)
+                    run_analysis(analyze_seqs, configs[analysis])
+                    break
             else:
                 raise ValueError('The type of analysis needs to be specified. It can '
                                'either be variant_effect_prediction, in_silico_mutagenesis '
                                'or prediction')
 
 
+def _parse_lr(value):
+    """
+    Convert a learning rate from the configs to a float, None if not
+    given. Raises ValueError if it is not a number.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"Learning rate must be a valid number, but got: {value}")
+
+def _to_analyze_ops(configs):
+    """
+    Get a view of the configs with the analyze operation, so that 
+    analyze-only configs can be run by execute(). The configs are not 
+    copied, execute() only reads them.
+    """
+    return ChainMap({"ops": ["analyze"]}, configs)
+
+@functools.lru_cache(maxsize=None)
+def _get_device():
+    """
+    Get the device to run on, "cuda" if available and "cpu" otherwise.
+    torch is only imported on the first call.
+    """
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
 def parse_configs_and_run(configs: Dict[str, Any]) -> None:
     """Parse configuration and run the specified task.
     
+    Errors are logged here only, with the traceback when ``debug`` is set 
+    in the configs, and then re-raised.
+
     Args:
         configs: Dictionary containing configuration parameters
     """
     try:
-        # Add import re if needed
-        import re
-        
         # Enhanced detection of configuration formats
         # Check if this is a legacy FuGEP-style config with ops key
         if "ops" in configs:
             ops = configs.get("ops", [])
-            logger.info(f"Detected legacy configuration format with operations: {ops}")
+            logger.info("Detected legacy configuration format with operations: %s", ops)
             return execute(configs)
             
         # Check if it's an analyze-only configuration without ops
-        if ("analyzer" in configs and ("variant_effect_prediction" in configs or 
-                                     "in_silico_mutagenesis" in configs or
-                                     "prediction" in configs)):
+        if "analyzer" in configs and not _ANALYZE_KEYS.isdisjoint(configs):
             logger.info("Detected analyze-only configuration without 'ops' key. Adding ops=['analyze'].")
-            temp_configs = configs.copy()
-            temp_configs["ops"] = ["analyze"]
-            return execute(temp_configs)
+            return execute(_to_analyze_ops(configs))
             
+        from uavarprior.train import StandardSGDTrainer
+
+        # Validate and extract key configurations, unknown modes and 
+        # wrongly typed values fail here, before the sampler and model are 
+        # built
+        cfg = RunConfig(**configs)
+        training_config = cfg.training
+        mode = cfg.mode
+
         # Check for CUDA availability and set device
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {device}")
-        
-        # Extract key configurations
-        data_config = configs.get("data", {})
-        model_config = configs.get("model", {})
-        training_config = configs.get("training", {})
-        metrics = training_config.get("metrics", [])
-        # Output directory
-        output_dir = configs.get("output_dir", None)
+        device = _get_device()
+        logger.info("Using device: %s", device)
 
         # Initialize sampler as data source and loader
         logger.info("Initializing sampler")
-        sampler_info = configs.get("sampler")
+        sampler_info = cfg.sampler
         
         # Debug logging to see what's in the configs
-        logger.debug(f"Available config keys: {list(configs.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Available config keys: %s", list(configs.keys()))
         if not sampler_info:
-            # If it's not a clear legacy config but has analyzer section, it's likely an analyze-only config
-            if "analyzer" in configs and ("variant_effect_prediction" in configs or 
-                                         "in_silico_mutagenesis" in configs or
-                                         "prediction" in configs):
-                logger.info("Detected analyze-only configuration. Using execute() function.")
-                temp_configs = configs.copy()
-                temp_configs["ops"] = ["analyze"]  # Add ops to make execute work
-                return execute(temp_configs)
-                
-            # If we get here, the config doesn't have a valid structure
+            # analyze-only configs were handled above, so the structure is
+            # not valid
             raise ValueError("Invalid configuration: Missing 'sampler' key and not a recognized legacy format. Check your YAML structure.")
         
         sampler = instantiate(sampler_info)
         
         # Get learning rate and ensure it's a float
-        lr_value = training_config.get('lr')
-        if lr_value is not None:
-            try:
-                lr_value = float(lr_value)
-            except (ValueError, TypeError):
-                raise ValueError(f"Learning rate must be a valid number, but got: {lr_value}")
-        else:
+        lr_value = _parse_lr(training_config.lr)
+        if lr_value is None:
             # If learning rate from training_config is None, try to get it from the top-level configs
-            lr_value = configs.get('lr')
-            if lr_value is not None:
-                try:
-                    lr_value = float(lr_value)
-                except (ValueError, TypeError):
-                    raise ValueError(f"Learning rate must be a valid number, but got: {lr_value}")
-            else:
-                logger.warning("No learning rate specified in config. This may cause issues if training is enabled.")
+            lr_value = _parse_lr(cfg.lr)
+        if lr_value is None:
+            logger.warning("No learning rate specified in config. This may cause issues if training is enabled.")
                 
         # initialize_model returns a wrapper with getOptimizer, setOptimizer, etc.
         model = initialize_model(
-            model_config,
+            cfg.model,
             train=True,
             lr=lr_value,
             configs=configs
@@ -825,31 +727,25 @@ def parse_configs_and_run(configs: Dict[str, Any]) -> None:
         trainer = StandardSGDTrainer(
             model=model,
             dataSampler=sampler,
-            outputDir=configs.get("output_dir"),
-            maxNSteps=training_config.get("max_steps", None),
-            batchSize=training_config.get("batch_size", 64),
+            outputDir=cfg.output_dir,
+            maxNSteps=training_config.max_steps,
+            batchSize=training_config.batch_size,
             useCuda=(device == "cuda"),
-            dataParallel=training_config.get("data_parallel", False),
-            loggingVerbosity=training_config.get("logging_verbosity", 2),
-            metrics=metrics,
+            dataParallel=training_config.data_parallel,
+            loggingVerbosity=training_config.logging_verbosity,
+            metrics=training_config.metrics,
         )
         
         # Run training or inference based on mode
-        mode = configs.get("mode", "train")
-        if mode == "train":
-            logger.info("Starting training...")
-            trainer.trainAndValidate()
-        elif mode == "evaluate":
-            logger.info("Starting evaluation...")
-            trainer.evaluate()
-        elif mode == "predict":
-            logger.info("Starting prediction...")
-            trainer.predict()
-        else:
-            raise ValueError(f"Unknown execution mode: {mode}")
+        logger.info("Starting %s...", {"train": "training",
+                                       "evaluate": "evaluation",
+                                       "predict": "prediction"}[mode])
+        {"train": trainer.trainAndValidate,
+         "evaluate": trainer.evaluate,
+         "predict": trainer.predict}[mode]()
     except Exception as e:
-        logger.error(f"Execution failed: {str(e)}")
-        if configs.get("debug", False):
-            import traceback
-            traceback.print_exc()
+        # the only place the failure is logged, the traceback is shown 
+        # with the debug flag
+        logger.error("Execution failed: %s", e,
+                     exc_info=bool(configs.get("debug", False)))
         raise
@@ -0,0 +1,206 @@
+"""
+Test the input sequences prepared by PeakGVarEvaluator against the one-hot
+encodings of the expected sequences
+"""
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from uavarprior.data import Genome
+from uavarprior.predict.seq_ana.gve.peak import PeakGVarEvaluator
+
+
+SEQ_LEN = 21
+COMPLEMENT = str.maketrans("ACGTacgtN", "TGCATGCAN")
+
+
+class _Model(object):
+    """
+    Stand-in for a trained model wrapper, keeping a copy of each batch
+    """
+    _model_built = 'pytorch'
+    _mult_predictions = 1
+
+    def __init__(self):
+        self.batches = []
+
+    def initFromFile(self, path):
+        pass
+
+    def setMode(self, mode):
+        pass
+
+    def predict(self, inputs):
+        sequences = inputs[0]['sequence']
+        self.batches.append(np.array(sequences))
+        return np.zeros((sequences.shape[0], 1))
+
+
+class _Blacklist(object):
+    """
+    Stand-in for a tabix handle of blacklist regions
+    """
+    def __init__(self, regions):
+        self.regions = regions
+
+    def query(self, chrom, start, end):
+        return [[c, str(s), str(e)] for c, s, e in self.regions
+                if c == chrom and s < end and e > start]
+
+
+class TestPeakGVarEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        chrom = list(rng.choice(list("ACGT"), 400))
+        chrom[150:200] = [b.lower() for b in chrom[150:200]]
+        chrom[170] = chrom[175] = 'N'
+        self.chrom = ''.join(chrom)
+        fastaPath = os.path.join(self.tmpDir, "ref.fasta")
+        with open(fastaPath, 'w') as f:
+            f.write(">chr1\n{0}\n".format(self.chrom))
+
+        self.variants = [
+            ("chr1", 100, "snv", self._ref(100, 1), "A", '+'),
+            ("chr1", 120, "ins", self._ref(120, 1), "CGTAC", '+'),
+            ("chr1", 140, "del", self._ref(140, 4), "G", '+'),
+            ("chr1", 160, "low", self._ref(160, 1), "T", '+'),
+            ("chr1", 230, "mnv", self._ref(230, 3), "TTA", '-'),
+            ("chr1", 250, "ins-", self._ref(250, 2), "AGGCT", '-'),
+        ]
+        vcfPath = os.path.join(self.tmpDir, "variants.vcf")
+        with open(vcfPath, 'w') as f:
+            f.write("#CHROM\tPOS\tID\tREF\tALT\tSTRAND\n")
+            for variant in self.variants:
+                f.write("\t".join(str(c) for c in variant) + "\n")
+
+        self.model = _Model()
+        self.evaluator = PeakGVarEvaluator(
+            analysis = ["diffs"], model = self.model,
+            trainedModelPath = "model.pth", features = ["f1"],
+            vcfFile = vcfPath, strandIdx = 5, outputDir = self.tmpDir,
+            seqLen = SEQ_LEN, batchSize = 4, refSeq = Genome(fastaPath),
+            groupVariants = True, numWorkers = 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def _ref(self, pos, refLen):
+        return self.chrom[pos - 1:pos - 1 + refLen].upper()
+
+    def _slice(self, start, end):
+        lhsPad = max(-start, 0)
+        rhsPad = max(end - len(self.chrom), 0)
+        return 'N' * lhsPad + \
+            self.chrom[max(start, 0):min(end, len(self.chrom))] + 'N' * rhsPad
+
+    def _expected(self, variant):
+        """
+        Get the one-hot encoded ref and alt sequences of a variant, built
+        from strings
+        """
+        chrom, pos, name, ref, alt, strand = variant
+        if alt == '*' or alt == '-':
+            alt = ''
+        refLen, altLen = len(ref), len(alt)
+        center = pos - 1 + refLen // 2
+        start = center - SEQ_LEN // 2
+        end = start + SEQ_LEN
+        refSeq = self._slice(start, end)
+        startPos = (SEQ_LEN - 1) // 2 - refLen // 2
+        endPos = startPos + refLen
+        if strand == '-':
+            # checked against the complement of ref, the alt allele is
+            # taken as given on the forward strand
+            ref = ref.translate(COMPLEMENT)
+
+        if refLen == altLen:
+            altSeq = refSeq[:startPos] + alt + refSeq[endPos:]
+        elif altLen > refLen:
+            altSeq = refSeq[:startPos] + alt + refSeq[endPos:]
+            truncStart = (len(altSeq) - SEQ_LEN) // 2
+            altSeq = altSeq[truncStart:truncStart + SEQ_LEN]
+        else:
+            altSeq = self._slice(start - refLen // 2 + altLen // 2, pos + 1) + \
+                alt + self._slice(pos + 1 + refLen, end + math.ceil(refLen / 2.)
+                                  - math.ceil(altLen / 2.))
+        if refSeq[startPos:endPos].upper() != ref:
+            refSeq = refSeq[:startPos] + ref + refSeq[endPos:]
+
+        if strand == '-':
+            refSeq = refSeq.translate(COMPLEMENT)[::-1]
+            altSeq = altSeq.translate(COMPLEMENT)[::-1]
+        return (Genome.sequence_to_encoding(refSeq),
+                Genome.sequence_to_encoding(altSeq))
+
+    def _assertPrepared(self, variant, bIdx = 0):
+        starts, ends, _, _ = self.evaluator._getWindows([variant])
+        self.evaluator._prepareVariant(variant, starts[0], ends[0], bIdx)
+        expectedRef, expectedAlt = self._expected(variant)
+        self.assertEqual(self.evaluator._refBuf[bIdx].tolist(),
+                         expectedRef.tolist())
+        self.assertEqual(self.evaluator._altBuf[bIdx].tolist(),
+                         expectedAlt.tolist())
+
+    def test_substitution(self):
+        self._assertPrepared(("chr1", 100, "v", self._ref(100, 1), "A", '+'))
+        self._assertPrepared(("chr1", 101, "v", self._ref(101, 1), "C", '-'))
+
+    def test_multi_nucleotide_substitution(self):
+        self._assertPrepared(("chr1", 100, "v", self._ref(100, 3), "GTA", '+'))
+        self._assertPrepared(("chr1", 110, "v", self._ref(110, 2), "CA", '-'))
+
+    def test_insertion(self):
+        self._assertPrepared(("chr1", 120, "v", self._ref(120, 1), "ACGTT", '+'))
+        self._assertPrepared(("chr1", 121, "v", self._ref(121, 2), "GATTACA", '-'))
+
+    def test_deletion(self):
+        self._assertPrepared(("chr1", 140, "v", self._ref(140, 4), "G", '+'))
+        self._assertPrepared(("chr1", 141, "v", self._ref(141, 7), "TC", '-'))
+
+    def test_deletion_symbols(self):
+        self._assertPrepared(("chr1", 140, "v", self._ref(140, 3), "*", '+'))
+        self._assertPrepared(("chr1", 145, "v", self._ref(145, 2), "-", '-'))
+
+    def test_mismatching_ref(self):
+        ref = self._ref(100, 2).translate(COMPLEMENT)
+        self._assertPrepared(("chr1", 100, "v", ref, "AA", '+'))
+
+    def test_lowercase_and_unknown_bases(self):
+        self._assertPrepared(("chr1", 160, "v", self._ref(160, 1), "T", '+'))
+        self._assertPrepared(("chr1", 165, "v", self._ref(165, 2), "GAC", '-'))
+        self._assertPrepared(("chr1", 168, "v", self._ref(168, 5), "A", '+'))
+
+    def test_blacklist_regions(self):
+        self.evaluator._refSeq._blacklist_tabix = _Blacklist(
+            [("chr1", 92, 95), ("chr1", 137, 139)])
+        self.chrom = self.chrom[:92] + 'NNN' + self.chrom[95:137] + 'NN' + \
+            self.chrom[139:]
+        self._assertPrepared(("chr1", 100, "v", self._ref(100, 1), "A", '+'))
+        self._assertPrepared(("chr1", 141, "v", self._ref(141, 3), "T", '-'))
+
+    def test_batch_rows(self):
+        for bIdx, variant in enumerate(self.variants[:4]):
+            self._assertPrepared(variant, bIdx)
+
+    def test_partial_batch(self):
+        self.evaluator.evaluate()
+        variants = self.evaluator._variants
+        self.assertEqual([b.shape[0] for b in self.model.batches], [8, 4])
+        for batch, batchVariants in ((self.model.batches[0], variants[:4]),
+                                     (self.model.batches[1], variants[4:])):
+            nVars = len(batchVariants)
+            for ix, variant in enumerate(batchVariants):
+                expectedRef, expectedAlt = self._expected(variant)
+                self.assertEqual(batch[ix].tolist(), expectedRef.tolist())
+                self.assertEqual(batch[nVars + ix].tolist(),
+                                 expectedAlt.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Test the integer base-code helpers in the gve utils module
+"""
+import unittest
+
+from uavarprior.data import Genome
+from uavarprior.predict.seq_ana.gve.utils import build_int_encoding_luts, \
+    get_int_encoding_luts, seq_to_int, seq_to_one_hot, int_to_seq
+
+
+class TestIntEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.asciiLut, self.oneHot, self.complementLut, self.intToAscii = \
+            build_int_encoding_luts(Genome.BASES_ARR, Genome.BASE_TO_INDEX,
+                                    Genome.COMPLEMENTARY_BASE_DICT,
+                                    Genome.UNK_BASE)
+
+    def test_seq_to_int(self):
+        observed = seq_to_int("ACGTacgtNR", self.asciiLut)
+        self.assertEqual(observed.tolist(), [0, 1, 2, 3, 0, 1, 2, 3, 4, 4])
+
+    def test_int_to_seq(self):
+        codes = seq_to_int("ACGTnA", self.asciiLut)
+        self.assertEqual(int_to_seq(codes, self.intToAscii), "ACGTNA")
+
+    def test_one_hot_matches_sequence_to_encoding(self):
+        sequence = "ACGTNacgtW"
+        observed = self.oneHot[seq_to_int(sequence, self.asciiLut)]
+        expected = Genome.sequence_to_encoding(sequence)
+        self.assertEqual(observed.tolist(), expected.tolist())
+
+    def test_seq_to_one_hot(self):
+        sequence = "ACGTNacgtW"
+        observed = seq_to_one_hot(sequence, self.asciiLut, self.oneHot)
+        expected = Genome.sequence_to_encoding(sequence)
+        self.assertEqual(observed.tolist(), expected.tolist())
+
+    def test_int_round_trip(self):
+        for sequence, expected in (("ACGTTGCA", "ACGTTGCA"),
+                                   ("acgtNn", "ACGTNN"),
+                                   ("NNNN", "NNNN"),
+                                   ("ANRYcW", "ANNNCN")):
+            codes = seq_to_int(sequence, self.asciiLut)
+            self.assertEqual(int_to_seq(codes, self.intToAscii), expected)
+
+    def test_one_hot_round_trip(self):
+        sequence = "ACGTacgtNnA"
+        encoding = seq_to_one_hot(sequence, self.asciiLut, self.oneHot)
+        self.assertEqual(Genome.encoding_to_sequence(encoding), "ACGTACGTNNA")
+
+    def test_get_int_encoding_luts_shared(self):
+        luts = get_int_encoding_luts(Genome)
+        self.assertIs(luts, get_int_encoding_luts(Genome))
+        for observed, expected in zip(luts, (self.asciiLut, self.oneHot,
+                                             self.complementLut,
+                                             self.intToAscii)):
+            self.assertFalse(observed.flags.writeable)
+            self.assertEqual(observed.tolist(), expected.tolist())
+
+    def test_complement(self):
+        codes = self.complementLut[seq_to_int("ACGTN", self.asciiLut)]
+        self.assertEqual(int_to_seq(codes, self.intToAscii), "TGCAN")
+
+
+if __name__ == "__main__":
+    unittest.main()
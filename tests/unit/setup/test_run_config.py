@@ -0,0 +1,45 @@
+"""
+Test the validation of the configuration read by parse_configs_and_run
+"""
+import unittest
+
+from pydantic import ValidationError
+
+from uavarprior.setup.config import RunConfig
+
+
+class TestRunConfig(unittest.TestCase):
+
+    def test_defaults(self):
+        cfg = RunConfig()
+        self.assertEqual(cfg.mode, "train")
+        self.assertEqual(cfg.training.batch_size, 64)
+        self.assertEqual(cfg.training.metrics, [])
+        self.assertIsNone(cfg.training.lr)
+
+    def test_values(self):
+        cfg = RunConfig(mode="evaluate", lr="1e-3", output_dir="out",
+                        training={"batch_size": 32, "max_steps": None},
+                        data={"path": "data"})
+        self.assertEqual(cfg.mode, "evaluate")
+        self.assertEqual(cfg.lr, 0.001)
+        self.assertEqual(cfg.training.batch_size, 32)
+        self.assertIsNone(cfg.training.max_steps)
+
+    def test_unknown_training_key(self):
+        with self.assertRaises(ValidationError):
+            RunConfig(training={"batch_szie": 32})
+
+    def test_wrong_type(self):
+        with self.assertRaises(ValidationError):
+            RunConfig(training={"lr": "fast"})
+        with self.assertRaises(ValidationError):
+            RunConfig(training={"batch_size": "large"})
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValidationError):
+            RunConfig(mode="tain")
+
+
+if __name__ == "__main__":
+    unittest.main()